@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event
+from .models import Event, ArchivedEvent
 
 
 class EventAdmin(admin.ModelAdmin):
@@ -20,3 +20,16 @@ class EventAdmin(admin.ModelAdmin):
 
 # Регистрируем модель Event и связываем ее с настройками EventAdmin
 admin.site.register(Event, EventAdmin)
+
+
+class ArchivedEventAdmin(admin.ModelAdmin):
+    """
+        Класс настройки административной панели для модели ArchivedEvent.
+    """
+    list_display = ('title', 'date_creation', 'date_archived', 'creator')
+    list_filter = ('date_archived',)
+    search_fields = ('title', 'creator__username')
+    raw_id_fields = ('members',)
+
+
+admin.site.register(ArchivedEvent, ArchivedEventAdmin)
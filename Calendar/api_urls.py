@@ -1,11 +1,18 @@
 from django.urls import path
-from .views import EventCreateView, EventListView, EventJoinView, EventLeaveView, EventDeleteView, EventMembersListView
+from .views import EventCreateView, EventListView, EventJoinView, EventLeaveView, EventDeleteView, EventMembersListView, \
+    EventBulkCreateView, StatsView, RecommendationsView, BatchView, \
+    SyncView
 
 urlpatterns = [
     path('events/create/', EventCreateView.as_view(), name='event-create'),
+    path('events/bulk-create/', EventBulkCreateView.as_view(), name='event-bulk-create'),
     path('events/list/', EventListView.as_view(), name='event-list'),
     path('events/<int:event_id>/members/', EventMembersListView.as_view(), name='event-members-list'),
     path('events/join/<int:pk>/', EventJoinView.as_view(), name='event-join'),
     path('events/leave/<int:pk>/', EventLeaveView.as_view(), name='event-leave'),
     path('events/delete/<int:pk>/', EventDeleteView.as_view(), name='event-delete'),
+    path('stats/', StatsView.as_view(), name='stats'),
+    path('users/<int:user_id>/recommendations/', RecommendationsView.as_view(), name='user-recommendations'),
+    path('batch/', BatchView.as_view(), name='batch'),
+    path('sync/', SyncView.as_view(), name='sync'),
 ]
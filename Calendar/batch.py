@@ -0,0 +1,109 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.test.client import RequestFactory
+from django.urls import resolve, Resolver404
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def build_subrequest(request, method, path, body):
+    """
+        Создает HttpRequest для подзапроса пакетного запроса.
+
+        Подзапрос наследует хост, адрес клиента и уже выполненную аутентификацию
+        внешнего запроса: пользователь передается в DRF через _force_auth_user,
+        поэтому токен повторно не проверяется.
+
+        Args:
+            request (Request): Внешний пакетный запрос.
+            method (str): HTTP-метод подзапроса.
+            path (str): Путь подзапроса (может содержать строку запроса).
+            body: Тело подзапроса (сериализуется в JSON) или None.
+
+        Returns:
+            HttpRequest: Подзапрос.
+
+    """
+    factory = RequestFactory(
+        HTTP_HOST=request.get_host(),
+        REMOTE_ADDR=request.META.get('REMOTE_ADDR', ''),
+        HTTP_USER_AGENT=request.META.get('HTTP_USER_AGENT', ''),
+    )
+    data = json.dumps(body) if body is not None else ''
+    subrequest = factory.generic(method, path, data, content_type='application/json', secure=request.is_secure())
+    if request.user.is_authenticated:
+        subrequest._force_auth_user = request.user
+        subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def dispatch(request, item):
+    """
+        Выполняет один подзапрос в текущем процессе.
+
+        Разрешены только пути API (/api/...), кроме самого пакетного запроса.
+
+        Args:
+            request (Request): Внешний пакетный запрос.
+            item (dict): Описание подзапроса: method, path, body.
+
+        Returns:
+            dict: Код ответа (status) и тело ответа (body) подзапроса.
+
+    """
+    method = str(item.get('method', 'GET')).upper()
+    path = str(item.get('path', ''))
+    try:
+        match = resolve(path.split('?', 1)[0])
+    except Resolver404:
+        match = None
+    if match is None or not match.route.startswith('api/') or match.url_name == 'batch':
+        return {'status': 404, 'body': {'error': f'Неизвестный путь: {path}'}}
+
+    subrequest = build_subrequest(request, method, path, item.get('body'))
+    response = match.func(subrequest, *match.args, **match.kwargs)
+    if hasattr(response, 'data'):
+        body = response.data
+    else:
+        content = response.content.decode(response.charset or 'utf-8')
+        try:
+            body = json.loads(content) if content else None
+        except ValueError:
+            body = content
+    return {'status': response.status_code, 'body': body}
+
+
+def dispatch_in_thread(request, item):
+    """
+        Выполняет подзапрос в потоке пула и закрывает соединения с БД этого потока.
+    """
+    try:
+        return dispatch(request, item)
+    finally:
+        connections.close_all()
+
+
+def dispatch_all(request, items, parallel, max_workers):
+    """
+        Выполняет все подзапросы и возвращает ответы в исходном порядке.
+
+        Если parallel=True и все подзапросы только читают данные, они выполняются
+        параллельно в пуле потоков, иначе - последовательно.
+
+        Args:
+            request (Request): Внешний пакетный запрос.
+            items (list): Описания подзапросов.
+            parallel (bool): Разрешено ли параллельное выполнение.
+            max_workers (int): Размер пула потоков.
+
+        Returns:
+            list: Ответы подзапросов.
+
+    """
+    read_only = all(str(item.get('method', 'GET')).upper() in SAFE_METHODS for item in items)
+    if not (parallel and read_only) or len(items) < 2:
+        return [dispatch(request, item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(lambda item: dispatch_in_thread(request, item), items))
@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+from itertools import islice
+
+from .membership import invalidate_user_event_ids
+from .models import Event
+from .stats import record_membership_changes
+from .recommendations import mark_dirty
+from .changelog import log_membership_changes
+
+
+def batched(iterable, size):
+    """
+        Разбивает итерируемый объект на списки фиксированного размера.
+
+        Args:
+            iterable: Исходная последовательность.
+            size (int): Размер пачки.
+
+        Yields:
+            list: Очередная пачка элементов (последняя может быть короче).
+
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def membership_fields(model=Event):
+    """
+        Возвращает промежуточную модель поля members и имена ее внешних ключей.
+
+        Args:
+            model: Модель с полем members (Event или ArchivedEvent).
+
+        Returns:
+            tuple: (through-модель, атрибут id события, атрибут id пользователя).
+
+    """
+    field = model._meta.get_field('members')
+    return field.remote_field.through, field.m2m_field_name() + '_id', field.m2m_reverse_field_name() + '_id'
+
+
+def bulk_add_members(pairs, batch_size=1000, model=Event, record_stats=True):
+    """
+        Массово добавляет участников событий напрямую в промежуточную таблицу.
+
+        В отличие от event.members.add(), не выполняет запрос на каждое событие
+        и не отправляет сигнал m2m_changed. Повторяющиеся и уже существующие пары
+        пропускаются и не учитываются как присоединения, закешированные множества событий затронутых пользователей сбрасываются,
+        их рекомендации помечаются для пересчета, присоединения записываются
+        в журнал изменений.
+
+        Args:
+            pairs: Итерируемый объект пар (id события, id пользователя).
+            batch_size (int): Количество строк в одном INSERT.
+            model: Модель с полем members (Event или ArchivedEvent).
+            record_stats (bool): Учитывать ли присоединения в накопительной статистике.
+
+        Returns:
+            int: Количество добавленных пар.
+
+    """
+    through, event_attr, user_attr = membership_fields(model)
+    total = 0
+    for batch in batched(pairs, batch_size):
+        batch = list(dict.fromkeys((int(event_id), int(user_id)) for event_id, user_id in batch))
+        existing = set(through.objects.filter(**{
+            f'{event_attr}__in': {event_id for event_id, _ in batch},
+            f'{user_attr}__in': {user_id for _, user_id in batch},
+        }).values_list(event_attr, user_attr))
+        added = [pair for pair in batch if pair not in existing]
+        if not added:
+            continue
+        through.objects.bulk_create(
+            [through(**{event_attr: event_id, user_attr: user_id}) for event_id, user_id in added],
+            ignore_conflicts=True,
+        )
+        if model is Event:
+            user_ids = {user_id for _, user_id in added}
+            invalidate_user_event_ids(user_ids)
+            mark_dirty(user_ids)
+            log_membership_changes(added)
+            if record_stats:
+                record_membership_changes(added, joined=True)
+        total += len(added)
+    return total
+
+
+@contextmanager
+def preserve_date_creation():
+    """
+        Временно отключает auto_now_add у Event.date_creation.
+
+        Нужно при импорте, чтобы bulk_create сохранял исходные даты создания
+        событий, а не подставлял текущее время.
+
+    """
+    field = Event._meta.get_field('date_creation')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
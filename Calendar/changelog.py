@@ -0,0 +1,95 @@
+from .models import ChangeLogEntry
+
+
+def log_event_changes(event_ids, deleted=False):
+    """
+        Записывает изменение или удаление событий в журнал изменений.
+
+        Args:
+            event_ids: Идентификаторы событий.
+            deleted (bool): True, если события удалены.
+
+    """
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(kind=ChangeLogEntry.EVENT, event_id=event_id, deleted=deleted) for event_id in event_ids
+    ])
+
+
+def log_membership_changes(pairs, deleted=False):
+    """
+        Записывает присоединения или выходы участников в журнал изменений.
+
+        Args:
+            pairs: Итерируемый объект пар (id события, id пользователя).
+            deleted (bool): True для выходов участников.
+
+    """
+    ChangeLogEntry.objects.bulk_create([
+        ChangeLogEntry(kind=ChangeLogEntry.MEMBER, event_id=event_id, user_id=user_id, deleted=deleted)
+        for event_id, user_id in pairs
+    ])
+
+
+def collect_changes(since, limit):
+    """
+        Собирает изменения после курсора, схлопывая повторные изменения одного объекта.
+
+        Присоединения и выходы участников удаленных событий не возвращаются:
+        клиенту достаточно удаления события.
+
+        Args:
+            since (int): Курсор - номер последнего полученного клиентом изменения.
+            limit (int): Максимальное количество записей журнала за один ответ.
+
+        Returns:
+            dict: Курсор следующего запроса (cursor), признак наличия продолжения (has_more),
+                  id измененных и удаленных событий, пары присоединений и выходов.
+
+    """
+    entries = list(
+        ChangeLogEntry.objects.filter(id__gt=since).order_by('id').values_list(
+            'id', 'kind', 'event_id', 'user_id', 'deleted'
+        )[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    events = {}
+    members = {}
+    for _, kind, event_id, user_id, deleted in entries:
+        if kind == ChangeLogEntry.EVENT:
+            events[event_id] = deleted
+        else:
+            members[(event_id, user_id)] = deleted
+
+    deleted_events = {event_id for event_id, deleted in events.items() if deleted}
+    members = {pair: deleted for pair, deleted in members.items() if pair[0] not in deleted_events}
+    return {
+        'cursor': entries[-1][0] if entries else since,
+        'has_more': has_more,
+        'changed_events': [event_id for event_id, deleted in events.items() if not deleted],
+        'deleted_events': [event_id for event_id, deleted in events.items() if deleted],
+        'joined': [list(pair) for pair, deleted in members.items() if not deleted],
+        'left': [list(pair) for pair, deleted in members.items() if deleted],
+    }
+
+
+def is_cursor_expired(since):
+    """
+        Проверяет, удалены ли из журнала записи, следующие за курсором.
+
+        Журнал очищается командой prune_changelog, поэтому клиент с курсором
+        старше первой сохраненной записи не может получить все изменения и
+        должен синхронизироваться заново. Пропуски в нумерации записей
+        (например, после откаченных транзакций) могут приводить к лишней, но
+        безопасной повторной синхронизации.
+
+        Args:
+            since (int): Курсор клиента.
+
+        Returns:
+            bool: True, если клиенту нужна полная синхронизация.
+
+    """
+    first_id = ChangeLogEntry.objects.order_by('id').values_list('id', flat=True).first()
+    return first_id is not None and since < first_id - 1
@@ -0,0 +1,20 @@
+from django.utils.functional import SimpleLazyObject
+
+from .membership import get_user_event_ids
+
+
+def membership(request):
+    """
+        Контекстный процессор с множеством событий текущего пользователя.
+
+        Добавляет в контекст шаблона my_event_ids - множество id событий, в которых
+        участвует пользователь. Множество вычисляется лениво и берется из кеша.
+
+        Args:
+            request (HttpRequest): Запрос от клиента.
+
+        Returns:
+            dict: Контекст шаблона.
+
+    """
+    return {'my_event_ids': SimpleLazyObject(lambda: get_user_event_ids(request.user))}
@@ -0,0 +1,76 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from Calendar.bulk import bulk_add_members, membership_fields
+from Calendar.models import ArchivedEvent, Event
+from Calendar.stats import archiving
+
+
+class Command(BaseCommand):
+    """
+        Переносит прошедшие события и их участников в архивные таблицы.
+
+        События старше заданного возраста обрабатываются пачками: каждая пачка
+        копируется в ArchivedEvent вместе с участниками и удаляется из Event
+        в одной транзакции, поэтому прерванный перенос можно просто запустить снова.
+        Если id события уже занят в архиве, перенос останавливается с ошибкой,
+        а событие остается в Event.
+        Архивированные события остаются в статистике создателей.
+
+    """
+    help = 'Переносит события старше заданного возраста в архив'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.EVENTS_ARCHIVE_AFTER_DAYS,
+            help='Возраст события в днях, после которого оно переносится в архив',
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Количество событий в одной транзакции')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size должен быть положительным')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+
+        through, event_attr, user_attr = membership_fields()
+        started = time.monotonic()
+        events_total = members_total = 0
+
+        while True:
+            ids = list(
+                Event.objects.filter(date_creation__lt=cutoff).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            collisions = sorted(ArchivedEvent.objects.filter(id__in=ids).values_list('id', flat=True))
+            if collisions:
+                raise CommandError(
+                    f'События с id {collisions} уже есть в архиве, перенос остановлен '
+                    f'(перенесено событий: {events_total})'
+                )
+
+            with transaction.atomic():
+                ArchivedEvent.objects.bulk_create(
+                    [ArchivedEvent(**row) for row in Event.objects.filter(id__in=ids).values(
+                        'id', 'title', 'text', 'date_creation', 'creator_id'
+                    )],
+                )
+                members_total += bulk_add_members(
+                    through.objects.filter(**{event_attr + '__in': ids}).values_list(event_attr, user_attr).iterator(),
+                    model=ArchivedEvent,
+                )
+                with archiving():
+                    Event.objects.filter(id__in=ids).delete()
+            events_total += len(ids)
+
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(f'В архиве: {events_total} событий, {members_total} участий ({events_total / elapsed:.0f} событий/с)')
+
+        self.stdout.write(self.style.SUCCESS(f'Архивация завершена: {events_total} событий'))
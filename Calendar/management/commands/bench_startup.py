@@ -0,0 +1,77 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Скрипт выполняется в отдельном процессе, чтобы каждый замер начинался с холодного старта
+PROBE = r'''
+import io, json, os, sys, time
+started = time.perf_counter()
+import django
+from django.core.handlers.wsgi import WSGIHandler
+django.setup(set_prefix=False)
+application = WSGIHandler()
+boot = time.perf_counter() - started
+
+warmup = 0.0
+if sys.argv[1] == 'warm':
+    from Calendar_Of_Events.warmup import warm_up
+    started = time.perf_counter()
+    warm_up()
+    warmup = time.perf_counter() - started
+
+def request(path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80', 'HTTP_HOST': 'localhost', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+        'wsgi.errors': sys.stderr,
+    }
+    statuses = []
+    started = time.perf_counter()
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b''.join(response)
+    response.close()
+    return time.perf_counter() - started, statuses[0]
+
+first, status = request(sys.argv[2])
+second, _ = request(sys.argv[2])
+print(json.dumps({'boot': boot, 'warmup': warmup, 'first': first, 'second': second, 'status': status}))
+'''
+
+
+class Command(BaseCommand):
+    """
+        Сравнивает задержку первого запроса в холодном и прогретом процессе.
+
+        Каждый замер выполняется в новом процессе Python с текущими настройками:
+        в холодном режиме первый запрос выполняется сразу после загрузки
+        приложения, в прогретом - после Calendar_Of_Events.warmup.warm_up().
+        Выводятся медианы времени загрузки, прогрева, первого и второго запроса.
+
+    """
+    help = 'Сравнивает задержку первого запроса без прогрева и с прогревом'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/index', help='Адрес запрашиваемой страницы')
+        parser.add_argument('--runs', type=int, default=5, help='Количество процессов на каждый режим')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)}
+        self.stdout.write(f'{"Режим":<10}{"загрузка мс":>13}{"прогрев мс":>12}{"1-й запрос мс":>15}{"2-й запрос мс":>15}  Код')
+        for mode in ('cold', 'warm'):
+            runs = []
+            for _ in range(options['runs']):
+                output = subprocess.run(
+                    [sys.executable, '-c', PROBE, mode, options['path']],
+                    capture_output=True, text=True, check=True, env=env, cwd=settings.BASE_DIR,
+                ).stdout
+                runs.append(json.loads(output.strip().splitlines()[-1]))
+            median = {key: statistics.median(run[key] for run in runs) * 1000 for key in ('boot', 'warmup', 'first', 'second')}
+            self.stdout.write(
+                f'{mode:<10}{median["boot"]:>13.1f}{median["warmup"]:>12.1f}'
+                f'{median["first"]:>15.1f}{median["second"]:>15.1f}  {runs[-1]["status"]}'
+            )
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Calendar import recommendations
+from Calendar.models import RecommendationState
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+        Пересчитывает рекомендации событий по графу совместного участия.
+
+        По умолчанию обрабатываются только пользователи, у которых изменились
+        участия (RecommendationState.dirty). С флагом --all граф загружается
+        целиком один раз и пересчитываются все пользователи.
+
+    """
+    help = 'Пересчитывает рекомендации событий для пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Пересчитать рекомендации для всех пользователей')
+        parser.add_argument('--top-k', type=int, default=10, help='Количество рекомендаций на пользователя')
+        parser.add_argument(
+            '--max-event-members', type=int, default=1000,
+            help='События с большим числом участников не используются для поиска соучастников',
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Количество пользователей в одной транзакции')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['all']:
+            graph = recommendations.load_graph(max_event_members=options['max_event_members'])
+            user_ids = list(CustomUser.objects.order_by('pk').values_list('pk', flat=True))
+        else:
+            graph = None
+            user_ids = list(RecommendationState.objects.filter(dirty=True).values_list('user_id', flat=True))
+
+        total = recommendations.refresh(
+            user_ids,
+            top_k=options['top_k'],
+            max_event_members=options['max_event_members'],
+            batch_size=options['batch_size'],
+            graph=graph,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рекомендации пересчитаны для {total} пользователей за {time.monotonic() - started:.1f} с'
+        ))
@@ -0,0 +1,102 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from Calendar.bulk import membership_fields
+from Calendar.models import Event
+
+
+class Command(BaseCommand):
+    """
+        Потоковая выгрузка событий и их участников в JSONL или CSV.
+
+        События и строки промежуточной таблицы читаются двумя курсорами,
+        отсортированными по id события, и сливаются на лету, поэтому память
+        не зависит от размера базы.
+
+        Формат строки: id, title, text, date_creation, creator (username создателя),
+        members (список username участников; в CSV - через ';').
+
+    """
+    help = 'Выгружает события и участников в JSONL или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Файл для записи ('-' - стандартный вывод)")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Формат файла (по умолчанию - по расширению)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Размер пачки при чтении из БД')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        chunk_size = options['chunk_size']
+
+        stream = sys.stdout if path == '-' else open(path, 'w', encoding='utf-8', newline='')
+        try:
+            started = time.monotonic()
+            count = self.export(stream, file_format, chunk_size)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stderr.write(f'Выгружено событий: {count} ({count / elapsed:.0f} строк/с)')
+
+    def export(self, stream, file_format, chunk_size):
+        """
+            Записывает все события в поток в выбранном формате.
+
+            Returns:
+                int: Количество выгруженных событий.
+
+        """
+        if file_format == 'csv':
+            writer = csv.writer(stream)
+            writer.writerow(['id', 'title', 'text', 'date_creation', 'creator', 'members'])
+
+            def write(row):
+                row['members'] = ';'.join(row['members'])
+                writer.writerow(row.values())
+        else:
+            def write(row):
+                stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+        count = 0
+        for row in self.iter_rows(chunk_size):
+            write(row)
+            count += 1
+        return count
+
+    def iter_rows(self, chunk_size):
+        """
+            Сливает поток событий с потоком участников, отсортированных по id события.
+        """
+        through, event_attr, user_attr = membership_fields()
+        user_field = user_attr[:-len('_id')]
+
+        events = Event.objects.order_by('id').values_list(
+            'id', 'title', 'text', 'date_creation', 'creator__username'
+        ).iterator(chunk_size=chunk_size)
+        members = through.objects.order_by(event_attr, user_attr).values_list(
+            event_attr, user_field + '__username'
+        ).iterator(chunk_size=chunk_size)
+
+        pending = next(members, None)
+        for event_id, title, text, date_creation, creator in events:
+            usernames = []
+            # Пропускаем строки участников событий, которых уже нет в выборке
+            while pending is not None and pending[0] < event_id:
+                pending = next(members, None)
+            while pending is not None and pending[0] == event_id:
+                usernames.append(pending[1])
+                pending = next(members, None)
+            yield {
+                'id': event_id,
+                'title': title,
+                'text': text,
+                'date_creation': date_creation.isoformat(),
+                'creator': creator,
+                'members': usernames,
+            }
@@ -0,0 +1,142 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from Calendar.bulk import batched, bulk_add_members, preserve_date_creation
+from Calendar.changelog import log_event_changes
+from Calendar.models import ArchivedEvent, Event
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+        Потоковая загрузка событий и их участников из JSONL или CSV.
+
+        Формат совпадает с выводом команды export_events. Файл читается построчно,
+        события вставляются через bulk_create пачками, участники - прямыми
+        INSERT в промежуточную таблицу. Соответствие username -> pk строится
+        один раз перед загрузкой, поэтому Event.save и сигналы не вызываются.
+        Исходные id событий по умолчанию не сохраняются (события получают новые id);
+        с --keep-ids сохраняются, а события с id, уже занятыми в Event или в архиве,
+        пропускаются.
+        Накопительная статистика после загрузки пересчитывается командой rebuild_stats.
+
+    """
+    help = 'Загружает события и участников из JSONL или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Файл для чтения ('-' - стандартный ввод)")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], help='Формат файла (по умолчанию - по расширению)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Количество событий в одной транзакции')
+        parser.add_argument('--keep-ids', action='store_true',
+                            help='Сохранить id событий из файла (события с id, занятыми в Event или архиве, пропускаются)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size должен быть положительным')
+
+        user_ids = dict(CustomUser.objects.values_list('username', 'pk').iterator())
+
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        try:
+            rows = self.read_csv(stream) if file_format == 'csv' else self.read_jsonl(stream)
+            self.load(rows, user_ids, batch_size, options['keep_ids'])
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    def read_jsonl(self, stream):
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+    def read_csv(self, stream):
+        for row in csv.DictReader(stream):
+            row['members'] = [name for name in (row.get('members') or '').split(';') if name]
+            yield row
+
+    def load(self, rows, user_ids, batch_size, keep_ids=False):
+        """
+            Загружает события пачками и выводит скорость загрузки.
+
+            Args:
+                rows: Итератор словарей с полями события.
+                user_ids (dict): Соответствие username -> pk пользователя.
+                batch_size (int): Количество событий в одной транзакции.
+                keep_ids (bool): Сохранять ли id событий из файла.
+
+        """
+        started = time.monotonic()
+        events_total = members_total = skipped = conflicts = 0
+        now = timezone.now()
+
+        for batch in batched(rows, batch_size):
+            taken = set()
+            if keep_ids:
+                batch_ids = {int(row['id']) for row in batch if row.get('id')}
+                taken = set(Event.objects.filter(id__in=batch_ids).values_list('id', flat=True))
+                taken.update(ArchivedEvent.objects.filter(id__in=batch_ids).values_list('id', flat=True))
+            events = []
+            event_members = []
+            for row in batch:
+                creator_id = user_ids.get(row.get('creator'))
+                if creator_id is None:
+                    skipped += 1
+                    continue
+                event_id = int(row['id']) if keep_ids and row.get('id') else None
+                if event_id is not None:
+                    if event_id in taken:
+                        conflicts += 1
+                        continue
+                    taken.add(event_id)
+                date_creation = parse_datetime(row['date_creation']) if row.get('date_creation') else now
+                if timezone.is_naive(date_creation):
+                    date_creation = timezone.make_aware(date_creation)
+                events.append(Event(
+                    id=event_id,
+                    title=row['title'],
+                    text=row.get('text') or '',
+                    date_creation=date_creation,
+                    creator_id=creator_id,
+                ))
+                event_members.append([user_ids[name] for name in row.get('members', []) if name in user_ids])
+
+            with transaction.atomic(), preserve_date_creation():
+                Event.objects.bulk_create(events, batch_size=batch_size)
+                log_event_changes(event.pk for event in events)
+                members_total += bulk_add_members(
+                    ((event.pk, user_id) for event, members in zip(events, event_members) for user_id in members),
+                    batch_size=batch_size,
+                    record_stats=False,
+                )
+            events_total += len(events)
+
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f'Событий: {events_total}, участий: {members_total} '
+                f'({(events_total + members_total) / elapsed:.0f} строк/с)'
+            )
+
+        if keep_ids:
+            # Счетчик id (например, последовательность PostgreSQL) должен продолжаться после загруженных id
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [Event]):
+                    cursor.execute(sql)
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(f'Пропущено событий с неизвестным создателем: {skipped}'))
+        if conflicts:
+            self.stdout.write(self.style.WARNING(f'Пропущено событий с уже существующим id: {conflicts}'))
+        self.stdout.write(self.style.SUCCESS(f'Загрузка завершена: {events_total} событий, {members_total} участий'))
+        self.stdout.write('Для обновления статистики выполните: manage.py rebuild_stats')
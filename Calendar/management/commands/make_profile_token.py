@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Calendar_Of_Events.middleware import make_profile_token
+
+
+class Command(BaseCommand):
+    """
+        Выводит подписанный токен для профилирования запросов.
+
+        Токен передается в заголовке X-Profile или параметре ?__profile=,
+        профилирование должно быть включено настройкой PROFILING_ENABLED.
+
+    """
+    help = 'Выводит токен для профилирования запросов'
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_profile_token())
+        self.stderr.write(f'Токен действует {settings.PROFILING_TOKEN_MAX_AGE} с')
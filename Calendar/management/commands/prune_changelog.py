@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from Calendar.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    """
+        Удаляет из журнала изменений записи старше заданного возраста.
+
+        Записи удаляются пачками по возрастанию id до последней записи, созданной
+        раньше границы. Клиенты /api/sync/ с курсором из удаленной части журнала
+        получают ответ 410 и синхронизируются заново.
+
+    """
+    help = 'Удаляет старые записи журнала изменений'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CHANGELOG_RETENTION_DAYS,
+                            help='Сколько дней хранить записи журнала')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Количество записей в одном DELETE')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0 or options['days'] < 0:
+            raise CommandError('--batch-size должен быть положительным, --days - неотрицательным')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        boundary = ChangeLogEntry.objects.filter(date_created__lt=cutoff).aggregate(last=Max('id'))['last']
+
+        total = 0
+        while boundary is not None:
+            ids = list(ChangeLogEntry.objects.filter(id__lte=boundary).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            total += ChangeLogEntry.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'Удалено записей журнала: {total}'))
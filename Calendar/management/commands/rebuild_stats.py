@@ -0,0 +1,56 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from Calendar.bulk import batched
+from Calendar.models import Event, ArchivedEvent, EventStats, CreatorStats
+
+
+class Command(BaseCommand):
+    """
+        Полностью пересчитывает накопительную статистику по событиям и создателям.
+
+        Нужна после массовой загрузки данных в обход сигналов (например, import_events)
+        или при расхождении счетчиков. Статистика создателей учитывает и
+        архивированные события. Дневная статистика присоединений и выходов
+        не пересчитывается: моменты присоединения в промежуточной таблице не хранятся.
+
+    """
+    help = 'Пересчитывает статистику по событиям и создателям'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Количество строк в одном INSERT')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            EventStats.objects.all().delete()
+            CreatorStats.objects.all().delete()
+
+            events = Event.objects.order_by().annotate(total=Count('members')).values_list('id', 'total')
+            for batch in batched(events.iterator(), batch_size):
+                EventStats.objects.bulk_create(
+                    [EventStats(event_id=event_id, members_count=total) for event_id, total in batch]
+                )
+
+            events_counts = Counter()
+            members_counts = Counter()
+            for model in (Event, ArchivedEvent):
+                creators = model.objects.order_by().values('creator_id').annotate(
+                    events_total=Count('id', distinct=True),
+                    members_total=Count('members'),
+                ).values_list('creator_id', 'events_total', 'members_total')
+                for creator_id, events_total, members_total in creators.iterator():
+                    events_counts[creator_id] += events_total
+                    members_counts[creator_id] += members_total
+            for batch in batched(events_counts.items(), batch_size):
+                CreatorStats.objects.bulk_create([
+                    CreatorStats(creator_id=creator_id, events_count=events_total, members_count=members_counts[creator_id])
+                    for creator_id, events_total in batch
+                ])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Статистика пересчитана: {EventStats.objects.count()} событий, {CreatorStats.objects.count()} создателей'
+        ))
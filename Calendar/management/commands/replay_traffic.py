@@ -0,0 +1,156 @@
+import json
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from Calendar_Of_Events.hosts import allowed_host
+from users.models import CustomUser
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def percentile(values, fraction):
+    """
+        Возвращает перцентиль отсортированного списка (ближайший ранг).
+    """
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class Command(BaseCommand):
+    """
+        Воспроизводит трафик, записанный TrafficCaptureMiddleware.
+
+        Запросы выполняются в текущем процессе через тестовый клиент против БД
+        из настроек, поэтому ее нужно заранее заполнить данными (например,
+        import_events). Интервалы между запросами сохраняются с ускорением --speed,
+        запросы выполняются в --concurrency потоках. По итогам выводятся
+        перцентили задержки и расхождения кодов ответа с записанными по каждому
+        имени маршрута. Запросы отправляются с хостом из ALLOWED_HOSTS.
+
+        По умолчанию воспроизводятся только читающие запросы (GET, HEAD, OPTIONS):
+        изменяющие запросы (вход, создание, присоединение, удаление событий)
+        выполняются только с флагом --allow-writes, на отдельной копии БД.
+
+    """
+    help = 'Воспроизводит записанный трафик и выводит задержки по маршрутам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=settings.TRAFFIC_CAPTURE_FILE, help='Файл с записанным трафиком')
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help='Ускорение относительно записи (0 - без пауз между запросами)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Количество потоков')
+        parser.add_argument('--limit', type=int, default=None, help='Воспроизвести не более указанного числа запросов')
+        parser.add_argument('--allow-writes', action='store_true',
+                            help='Воспроизводить и изменяющие запросы (POST, PUT, DELETE...) - только на копии БД')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] <= 0 or options['speed'] < 0:
+            raise CommandError('--concurrency должен быть положительным, --speed - неотрицательным')
+        records = self.read_records(options['path'], options['limit'])
+        if not options['allow_writes']:
+            skipped = sum(record['method'].upper() not in SAFE_METHODS for record in records)
+            records = [record for record in records if record['method'].upper() in SAFE_METHODS]
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f'Пропущено изменяющих запросов: {skipped} (для воспроизведения укажите --allow-writes)'
+                ))
+        if not records:
+            raise CommandError('В файле нет записанных запросов')
+
+        self.users = CustomUser.objects.in_bulk({record['user_id'] for record in records if record.get('user_id')})
+        self.host = allowed_host()
+        self.local = threading.local()
+        results = []
+        results_lock = threading.Lock()
+
+        def run(record):
+            result = self.replay(record)
+            with results_lock:
+                results.append(result)
+
+        speed = options['speed']
+        first_ts = records[0].get('ts', 0)
+        started = time.monotonic()
+        # Воспроизводимые запросы не должны снова попадать в файл записи
+        with override_settings(TRAFFIC_CAPTURE_RATE=0), ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            for record in records:
+                if speed:
+                    delay = (record.get('ts', first_ts) - first_ts) / speed - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                executor.submit(run, record)
+        self.report(results, time.monotonic() - started)
+
+    def read_records(self, path, limit):
+        """
+            Читает записанные запросы, пропуская строки другого формата.
+        """
+        records = []
+        with open(path, encoding='utf-8') as stream:
+            for line in stream:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and 'method' in record and 'path' in record:
+                    records.append(record)
+                    if limit is not None and len(records) >= limit:
+                        break
+        records.sort(key=lambda record: record.get('ts', 0))
+        return records
+
+    def get_client(self, user_id):
+        """
+            Возвращает клиент текущего потока, аутентифицированный как записанный пользователь.
+        """
+        clients = getattr(self.local, 'clients', None)
+        if clients is None:
+            clients = self.local.clients = {}
+        if user_id not in clients:
+            client = APIClient(HTTP_HOST=self.host)
+            user = self.users.get(user_id)
+            if user is not None:
+                client.force_login(user)
+                client.force_authenticate(user)
+            clients[user_id] = client
+        return clients[user_id]
+
+    def replay(self, record):
+        client = self.get_client(record.get('user_id'))
+        body = record.get('body') or ''
+        started = time.perf_counter()
+        try:
+            response = client.generic(
+                record['method'], record['path'], body.encode('utf-8'),
+                content_type=record.get('content_type') or 'application/octet-stream',
+            )
+            status = response.status_code
+        except Exception:
+            status = 'exception'
+        duration = (time.perf_counter() - started) * 1000
+        return record.get('url_name') or record['path'], record.get('status'), status, duration
+
+    def report(self, results, elapsed):
+        by_name = defaultdict(list)
+        diffs = defaultdict(Counter)
+        for name, recorded, replayed, duration in results:
+            by_name[name].append(duration)
+            if recorded != replayed:
+                diffs[name][f'{recorded}->{replayed}'] += 1
+
+        self.stdout.write(f'Запросов: {len(results)} за {elapsed:.1f} с ({len(results) / max(elapsed, 1e-6):.1f} запр/с)')
+        self.stdout.write(f'{"Маршрут":<40}{"кол-во":>8}{"p50 мс":>10}{"p95 мс":>10}{"p99 мс":>10}  Расхождения кодов')
+        for name in sorted(by_name, key=str):
+            durations = sorted(by_name[name])
+            diff = ', '.join(f'{change}: {count}' for change, count in diffs[name].most_common()) or '-'
+            self.stdout.write(
+                f'{str(name):<40}{len(durations):>8}{percentile(durations, 0.5):>10.2f}'
+                f'{percentile(durations, 0.95):>10.2f}{percentile(durations, 0.99):>10.2f}  {diff}'
+            )
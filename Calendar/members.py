@@ -0,0 +1,76 @@
+from django.db.models import Exists, F, OuterRef, Q
+
+from .bulk import membership_fields
+from .models import Event
+from users.models import CustomUser
+
+
+def prefix_range(field, prefix):
+    """
+        Возвращает условие "поле начинается с prefix" в виде диапазона.
+
+        В отличие от __startswith (LIKE), сравнение по диапазону использует
+        обычный индекс поля в любой БД.
+
+        Args:
+            field (str): Имя поля.
+            prefix (str): Непустой префикс.
+
+        Returns:
+            Q: Условие field >= prefix и field < следующей за prefix строки.
+
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+
+
+def get_members_page(event_id, after=0, limit=50, query='', model=Event):
+    """
+        Возвращает страницу участников события.
+
+        Страницы выбираются по ключу (id пользователя больше after), поэтому время
+        получения страницы не зависит от ее номера. Без поиска строки читаются из
+        промежуточной таблицы по ее уникальному индексу (событие, пользователь).
+        Поиск по началу имени или фамилии выполняется без учета регистра и
+        начинается с индексов CustomUser.search_first_name и search_last_name
+        (объединение двух диапазонов), участие в событии проверяется для каждого
+        найденного пользователя по тому же уникальному индексу. Поэтому время
+        поиска зависит от числа пользователей с таким началом имени, а не от
+        размера события. Читаются только id, имя и фамилия.
+
+        Args:
+            event_id (int): Идентификатор события.
+            after (int): id последнего участника предыдущей страницы (0 - первая страница).
+            limit (int): Размер страницы.
+            query (str): Начало имени или фамилии.
+            model: Event или ArchivedEvent.
+
+        Returns:
+            tuple: (список словарей id, first_name, last_name; курсор следующей страницы или None).
+
+    """
+    through, event_attr, user_attr = membership_fields(model)
+    query = query.strip().casefold()
+    if query:
+        # Условие курсора вычисляется выражением, чтобы планировщик не выбирал
+        # диапазон по первичному ключу вместо индекса имени.
+        users = CustomUser.objects.alias(key=F('id') + 0).filter(
+            Exists(through.objects.filter(**{event_attr: event_id, user_attr: OuterRef('pk')})),
+            key__gt=after,
+        )
+        rows = users.filter(prefix_range('search_first_name', query)).values_list('id', 'first_name', 'last_name').union(
+            users.filter(prefix_range('search_last_name', query)).values_list('id', 'first_name', 'last_name')
+        ).order_by('id')
+    else:
+        user_field = user_attr[:-len('_id')]
+        rows = through.objects.filter(**{event_attr: event_id, f'{user_attr}__gt': after}).order_by(user_attr).values_list(
+            user_attr, f'{user_field}__first_name', f'{user_field}__last_name'
+        )
+
+    members = [
+        {'id': user_id, 'first_name': first_name, 'last_name': last_name}
+        for user_id, first_name, last_name in rows[:limit + 1]
+    ]
+    if len(members) > limit:
+        return members[:limit], members[limit - 1]['id']
+    return members, None
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .models import Event
+
+
+def _cache_key(user_id):
+    return f'calendar:user-events:{user_id}'
+
+
+def get_user_event_ids(user):
+    """
+        Возвращает множество id событий, в которых участвует пользователь.
+
+        Множество хранится в кеше и заполняется лениво при первом обращении.
+        При изменении участий пользователя оно сбрасывается (см. invalidate_user_event_ids).
+        Внутри транзакции множество читается из БД без записи в кеш: транзакция
+        может быть откачена.
+
+        Args:
+            user (CustomUser): Пользователь.
+
+        Returns:
+            set: Множество id событий (пустое для анонимного пользователя).
+
+    """
+    if not user.is_authenticated:
+        return set()
+    key = _cache_key(user.pk)
+    event_ids = cache.get(key)
+    if event_ids is None:
+        event_ids = set(Event.members.through.objects.filter(customuser_id=user.pk).values_list('event_id', flat=True))
+        if not connection.in_atomic_block:
+            cache.set(key, event_ids, settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return event_ids
+
+
+def is_member(user, event_id):
+    """
+        Проверяет, участвует ли пользователь в событии.
+
+        Args:
+            user (CustomUser): Пользователь.
+            event_id (int): Идентификатор события.
+
+        Returns:
+            bool: True, если пользователь участвует в событии.
+
+    """
+    return event_id in get_user_event_ids(user)
+
+
+def invalidate_user_event_ids(user_ids):
+    """
+        Сбрасывает закешированные множества событий для указанных пользователей.
+
+        Множество не изменяется на месте: ключи удаляются сразу и еще раз после
+        фиксации текущей транзакции, чтобы в кеш не попали ни незафиксированные
+        изменения, ни состояние, прочитанное параллельным запросом до фиксации.
+
+        Args:
+            user_ids: Идентификаторы пользователей.
+
+    """
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -16,13 +16,10 @@ class Event(models.Model):
         Methods:
             __str__(): Возвращает строковое представление события (его название).
 
-            save(*args, **kwargs): Переопределенный метод сохранения события, который автоматически
-            устанавливает создателя события, если он не указан.
-
     """
     title = models.CharField(max_length=255)
     text = models.TextField()
-    date_creation = models.DateTimeField(auto_now_add=True)
+    date_creation = models.DateTimeField(auto_now_add=True, db_index=True)
     creator = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -34,18 +31,183 @@ class Event(models.Model):
     def __str__(self):
         return self.title
 
-    def save(self, *args, **kwargs):
-        """
-            Переопределенный метод сохранения события.
 
-            Если создатель события не указан, метод попытается установить
-            создателя на основе текущего пользователя.
+class ArchivedEvent(models.Model):
+    """
+        Модель для хранения архивных (прошедших) событий.
+
+        События старше EVENTS_ARCHIVE_AFTER_DAYS переносятся сюда командой archive_events,
+        чтобы основная таблица Event и ее промежуточная таблица участников оставались небольшими.
+        Идентификатор сохраняется таким же, как у исходного события.
+
+        Attributes:
+            id (BigIntegerField): Идентификатор исходного события.
+            title (CharField): Название события.
+            text (TextField): Текстовое описание события.
+            date_creation (DateTimeField): Дата и время создания исходного события.
+            date_archived (DateTimeField): Дата и время переноса в архив.
+            creator (ForeignKey): Создатель события.
+            members (ManyToManyField): Участники события на момент архивации.
+
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    text = models.TextField()
+    date_creation = models.DateTimeField(db_index=True)
+    date_archived = models.DateTimeField(auto_now_add=True)
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_created_events',
+    )
+    members = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='archived_participation_in_events')
+
+    def __str__(self):
+        return self.title
+
+
+class EventStats(models.Model):
+    """
+        Накопительная статистика по событию.
+
+        Обновляется инкрементально из сигналов, поэтому рейтинг событий по числу
+        участников не требует COUNT по промежуточной таблице.
+
+        Attributes:
+            event (OneToOneField): Событие.
+            members_count (IntegerField): Текущее количество участников.
+
+    """
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    members_count = models.IntegerField(default=0, db_index=True)
+
+
+class CreatorStats(models.Model):
+    """
+        Накопительная статистика по создателю событий.
+
+        Attributes:
+            creator (OneToOneField): Создатель событий.
+            events_count (IntegerField): Количество созданных событий.
+            members_count (IntegerField): Суммарное количество участников во всех его событиях.
+
+    """
+    creator = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='creator_stats'
+    )
+    events_count = models.IntegerField(default=0, db_index=True)
+    members_count = models.IntegerField(default=0, db_index=True)
+
+
+class EventDailyStats(models.Model):
+    """
+        Количество присоединений и выходов по событию за день.
+
+        Хранит идентификатор события без внешнего ключа, чтобы история
+        сохранялась после удаления или архивации события.
+
+        Attributes:
+            event_id (BigIntegerField): Идентификатор события.
+            date (DateField): День.
+            joins (IntegerField): Количество присоединений за день.
+            leaves (IntegerField): Количество выходов за день.
+
+    """
+    event_id = models.BigIntegerField()
+    date = models.DateField(db_index=True)
+    joins = models.IntegerField(default=0)
+    leaves = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('event_id', 'date')
+
+
+class DailyStats(models.Model):
+    """
+        Суммарное количество присоединений и выходов по всем событиям за день.
+
+        Attributes:
+            date (DateField): День.
+            joins (IntegerField): Количество присоединений за день.
+            leaves (IntegerField): Количество выходов за день.
+
+    """
+    date = models.DateField(primary_key=True)
+    joins = models.IntegerField(default=0)
+    leaves = models.IntegerField(default=0)
+
+
+class EventRecommendation(models.Model):
+    """
+        Заранее рассчитанная рекомендация события пользователю.
+
+        Рассчитывается командой build_recommendations по графу совместного участия:
+        чем больше участников событий пользователя также участвуют в событии,
+        тем выше его оценка.
+
+        Attributes:
+            user (ForeignKey): Пользователь, которому рекомендуется событие.
+            event (ForeignKey): Рекомендуемое событие.
+            score (FloatField): Оценка рекомендации.
+
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recommendations')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
 
-            Args:
-                *args: Позиционные аргументы.
-                **kwargs: Именованные аргументы.
+    class Meta:
+        indexes = [models.Index(fields=['user', '-score'])]
+
+
+class RecommendationState(models.Model):
+    """
+        Состояние рекомендаций пользователя.
+
+        Флаг dirty выставляется при изменении участий пользователя, чтобы
+        build_recommendations пересчитывал только затронутых пользователей.
+
+        Attributes:
+            user (OneToOneField): Пользователь.
+            dirty (BooleanField): Требуется ли пересчет рекомендаций.
+            date_refreshed (DateTimeField): Дата и время последнего пересчета.
+
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recommendation_state'
+    )
+    dirty = models.BooleanField(default=True, db_index=True)
+    date_refreshed = models.DateTimeField(null=True, blank=True)
+
+
+class ChangeLogEntry(models.Model):
+    """
+        Запись журнала изменений для дельта-синхронизации клиентов.
+
+        Идентификатор записи монотонно возрастает и служит курсором синхронизации.
+        Удаления сохраняются как записи с deleted=True (tombstone).
+
+        Attributes:
+            id (BigAutoField): Порядковый номер изменения.
+            kind (CharField): Тип изменения: событие (event) или участие (member).
+            event_id (BigIntegerField): Идентификатор события.
+            user_id (IntegerField): Идентификатор участника (только для kind=member).
+            deleted (BooleanField): True для удаления события или выхода участника.
+            date_created (DateTimeField): Дата и время изменения.
+
+    """
+    EVENT = 'event'
+    MEMBER = 'member'
+    KIND_CHOICES = [(EVENT, 'Событие'), (MEMBER, 'Участие')]
 
-        """
-        if not self.creator:
-            self.creator = settings.AUTH_USER_MODEL.objects.get(pk=self.user_id)
-        super(Event, self).save(*args, **kwargs)
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=6, choices=KIND_CHOICES)
+    event_id = models.BigIntegerField()
+    user_id = models.IntegerField(null=True, blank=True)
+    deleted = models.BooleanField(default=False)
+    date_created = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,208 @@
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from scipy import sparse
+
+from .models import Event, EventRecommendation, RecommendationState
+
+
+def mark_dirty(user_ids):
+    """
+        Помечает рекомендации пользователей как требующие пересчета.
+
+        Args:
+            user_ids: Идентификаторы пользователей.
+
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    RecommendationState.objects.bulk_create(
+        [RecommendationState(user_id=user_id, dirty=True) for user_id in user_ids],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['dirty'],
+    )
+
+
+class Graph:
+    """
+        Разреженный граф участий: матрица пользователь x событие в формате CSR.
+
+        Attributes:
+            user_ids (ndarray): id пользователей по строкам (по возрастанию).
+            event_ids (ndarray): id событий по столбцам (по возрастанию).
+            matrix (csr_matrix): 1, если пользователь участвует в событии.
+            small (ndarray): Признак события, по которому ищутся соучастники
+                             (не больше max_event_members участников).
+            activity (ndarray): Количество событий каждого пользователя.
+
+    """
+
+    def __init__(self, pairs, max_event_members, small_event_ids=None):
+        """
+            Args:
+                pairs (ndarray): Массив пар (id пользователя, id события) формы (n, 2).
+                max_event_members (int): Максимальный размер события для поиска соучастников.
+                small_event_ids: id событий, размер которых уже проверен в БД; если не указаны,
+                                 размер событий считается по самой матрице (полный граф).
+
+        """
+        self.user_ids, users = np.unique(pairs[:, 0], return_inverse=True)
+        self.event_ids, events = np.unique(pairs[:, 1], return_inverse=True)
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.float32), (users, events)),
+            shape=(len(self.user_ids), len(self.event_ids)),
+        )
+        if small_event_ids is None:
+            self.small = np.asarray(self.matrix.sum(axis=0)).ravel() <= max_event_members
+        else:
+            self.small = np.isin(self.event_ids, np.fromiter(small_event_ids, dtype=np.int64))
+        self.activity = np.asarray(self.matrix.sum(axis=1), dtype=np.float64).ravel()
+
+    def rows(self, user_ids):
+        """
+            Возвращает номера строк пользователей, присутствующих в графе.
+
+            Returns:
+                tuple: (id найденных пользователей, номера их строк).
+
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        positions = np.searchsorted(self.user_ids, user_ids)
+        found = positions < len(self.user_ids)
+        found[found] = self.user_ids[positions[found]] == user_ids[found]
+        return user_ids[found], positions[found]
+
+
+def read_pairs(queryset, chunk_size=100000):
+    """
+        Читает пары (id пользователя, id события) промежуточной таблицы в массив numpy по частям.
+    """
+    iterator = queryset.values_list('customuser_id', 'event_id').iterator(chunk_size=chunk_size)
+    parts = []
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        parts.append(np.array(chunk, dtype=np.int64))
+    return np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.int64)
+
+
+def load_graph(user_ids=None, max_event_members=1000):
+    """
+        Загружает граф участий.
+
+        Для полного пересчета читается вся промежуточная таблица. Для выборочного
+        читаются только строки, нужные для рекомендаций указанным пользователям:
+        их события, участники их событий размером не больше max_event_members
+        (фильтр выполняется в БД) и события этих участников.
+
+        Args:
+            user_ids: Идентификаторы пользователей или None для всего графа.
+            max_event_members (int): Максимальный размер события для поиска соучастников.
+
+        Returns:
+            Graph: Граф участий.
+
+    """
+    through = Event.members.through
+    if user_ids is None:
+        return Graph(read_pairs(through.objects.order_by()), max_event_members)
+
+    own_events = through.objects.filter(customuser_id__in=user_ids).values('event_id')
+    small_events = through.objects.filter(event_id__in=own_events).order_by().values('event_id').annotate(
+        members=Count('id'),
+    ).filter(members__lte=max_event_members).values('event_id')
+    neighbours = through.objects.filter(event_id__in=small_events).values('customuser_id')
+    rows = through.objects.filter(Q(customuser_id__in=neighbours) | Q(customuser_id__in=user_ids)).order_by()
+    return Graph(
+        read_pairs(rows), max_event_members,
+        small_event_ids=small_events.values_list('event_id', flat=True),
+    )
+
+
+def score_users(graph, user_ids, top_k):
+    """
+        Рассчитывает top-k рекомендаций для пользователей по совместному участию.
+
+        Оценка события - сумма по соучастникам пользователя, участвующим в нем,
+        где вклад соучастника равен числу общих событий, деленному на логарифм
+        его активности (чтобы очень активные пользователи не доминировали).
+        Соучастники ищутся только по событиям не больше max_event_members
+        участников (Graph.small). Расчет выполняется произведениями разреженных
+        матриц сразу для всех переданных пользователей.
+
+        Args:
+            graph (Graph): Граф участий.
+            user_ids: Идентификаторы пользователей.
+            top_k (int): Количество рекомендаций.
+
+        Returns:
+            dict: id пользователя -> список пар (id события, оценка) по убыванию оценки.
+
+    """
+    found, rows = graph.rows(user_ids)
+    if not len(rows):
+        return {}
+    own = graph.matrix[rows]
+    common = own @ sparse.diags(graph.small.astype(np.float32)) @ graph.matrix.T
+    weights = common @ sparse.diags(1 / np.log(2 + graph.activity))
+    itself = sparse.csr_matrix((np.ones(len(rows)), (np.arange(len(rows)), rows)), shape=weights.shape)
+    weights = weights - weights.multiply(itself)
+    scores = sparse.csr_matrix(weights @ graph.matrix)
+    scores = sparse.csr_matrix(scores - scores.multiply(own))
+    scores.eliminate_zeros()
+
+    result = {}
+    for position, user_id in enumerate(found):
+        start, end = scores.indptr[position], scores.indptr[position + 1]
+        values = scores.data[start:end]
+        events = graph.event_ids[scores.indices[start:end]]
+        if len(values) > top_k:
+            best = np.argpartition(-values, top_k - 1)[:top_k]
+            values, events = values[best], events[best]
+        order = np.lexsort((events, -values))
+        result[int(user_id)] = [(int(events[i]), float(values[i])) for i in order]
+    return result
+
+
+def refresh(user_ids, top_k=10, max_event_members=1000, batch_size=500, graph=None):
+    """
+        Пересчитывает и сохраняет рекомендации для указанных пользователей.
+
+        Args:
+            user_ids (list): Идентификаторы пользователей.
+            top_k (int): Количество рекомендаций на пользователя.
+            max_event_members (int): Максимальный размер события для поиска соучастников.
+            batch_size (int): Количество пользователей, пересчитываемых за одну транзакцию.
+            graph (Graph): Заранее загруженный полный граф (см. load_graph); если не указан,
+                           для каждой пачки загружается только нужная ее часть.
+
+        Returns:
+            int: Количество обработанных пользователей.
+
+    """
+    total = 0
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        scored = score_users(graph or load_graph(batch, max_event_members), batch, top_k)
+        recommendations = [
+            EventRecommendation(user_id=user_id, event_id=event_id, score=score)
+            for user_id, events in scored.items()
+            for event_id, score in events
+        ]
+        with transaction.atomic():
+            EventRecommendation.objects.filter(user_id__in=batch).delete()
+            EventRecommendation.objects.bulk_create(recommendations)
+            RecommendationState.objects.bulk_create(
+                [RecommendationState(user_id=user_id, dirty=False, date_refreshed=timezone.now()) for user_id in batch],
+                update_conflicts=True,
+                unique_fields=['user'],
+                update_fields=['dirty', 'date_refreshed'],
+            )
+        total += len(batch)
+    return total
@@ -1,5 +1,10 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Event
+from .bulk import bulk_add_members
+from .models import Event, ArchivedEvent
+from .stats import record_events_created
+from .changelog import log_event_changes
+from users.models import CustomUser
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -7,3 +12,62 @@ class EventSerializer(serializers.ModelSerializer):
         model = Event
         fields = '__all__'
 
+
+class EventSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Event
+        fields = ('id', 'title', 'text', 'date_creation', 'creator')
+
+
+class ArchivedEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedEvent
+        fields = '__all__'
+
+
+class EventBulkListSerializer(serializers.ListSerializer):
+    """
+        Сериализатор списка событий для массового создания.
+
+        Убирает повторяющиеся id участников, проверяет существование всех
+        участников одним запросом и сохраняет
+        события одним bulk_create, а участников - пачками в промежуточную таблицу.
+    """
+
+    def validate(self, attrs):
+        for item in attrs:
+            item['member_ids'] = list(dict.fromkeys(item['member_ids']))
+        member_ids = {user_id for item in attrs for user_id in item['member_ids']}
+        existing = set(CustomUser.objects.filter(pk__in=member_ids).values_list('pk', flat=True))
+        missing = member_ids - existing
+        if missing:
+            raise serializers.ValidationError(f"Пользователи не найдены: {sorted(missing)}")
+        return attrs
+
+    def create(self, validated_data):
+        members = [item.pop('member_ids') for item in validated_data]
+        events = [Event(**item) for item in validated_data]
+        with transaction.atomic():
+            Event.objects.bulk_create(events)
+            record_events_created(event.creator_id for event in events)
+            log_event_changes(event.pk for event in events)
+            bulk_add_members((event.pk, user_id) for event, user_ids in zip(events, members) for user_id in user_ids)
+        for event, user_ids in zip(events, members):
+            event.member_ids = user_ids
+        return events
+
+
+class EventBulkCreateSerializer(serializers.ModelSerializer):
+    """
+        Сериализатор события для массового создания.
+
+        Участники передаются списком id и не проверяются по одному:
+        проверка выполняется для всего списка в EventBulkListSerializer.
+    """
+    members = serializers.ListField(child=serializers.IntegerField(), source='member_ids', required=False, default=list)
+
+    class Meta:
+        model = Event
+        fields = ('id', 'title', 'text', 'date_creation', 'creator', 'members')
+        read_only_fields = ('creator',)
+        list_serializer_class = EventBulkListSerializer
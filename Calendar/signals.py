@@ -1,23 +1,201 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
-from django.contrib.auth import get_user_model
 from .models import Event
+from .membership import invalidate_user_event_ids
+from .stats import record_membership_changes, record_events_created, record_event_deleted
+from .recommendations import mark_dirty
+from .changelog import log_event_changes, log_membership_changes
 
 
-@receiver(pre_save, sender=Event)
-def set_creator_if_not_specified(sender, instance, **kwargs):
+def membership_pairs(instance, reverse, pk_set):
     """
-        Обработчик сигнала pre_save для модели Event.
+        Преобразует аргументы сигнала m2m_changed в пары (id события, id пользователя).
 
-        Если создатель события не указан, функция попытается установить
-        создателя на основе текущего пользователя.
+        Args:
+            instance: Событие (или пользователь, если изменение идет с обратной стороны).
+            reverse (bool): True, если изменение выполнено через user.participation_in_events.
+            pk_set: Идентификаторы добавленных или удаленных объектов.
+
+        Returns:
+            list: Пары (id события, id пользователя).
+
+    """
+    if reverse:
+        return [(event_id, instance.pk) for event_id in pk_set]
+    return [(instance.pk, user_id) for user_id in pk_set]
+
+
+@receiver(m2m_changed, sender=Event.members.through)
+def remember_cleared_members(sender, instance, action, reverse, **kwargs):
+    """
+        Обработчик сигнала m2m_changed, запоминающий связи перед очисткой.
+
+        Для действия clear Django не передает pk_set, поэтому идентификаторы
+        удаляемых связей сохраняются в instance._cleared_pks до очистки.
+
+        Args:
+            sender: Промежуточная модель Event.members.
+            instance: Событие (или пользователь, если изменение идет с обратной стороны).
+            action (str): Тип изменения.
+            reverse (bool): True, если изменение выполнено через user.participation_in_events.
+            **kwargs: Дополнительные аргументы.
+
+    """
+    if action == 'pre_clear':
+        if reverse:
+            rows = sender.objects.filter(customuser_id=instance.pk).values_list('event_id', flat=True)
+        else:
+            rows = sender.objects.filter(event_id=instance.pk).values_list('customuser_id', flat=True)
+        instance._cleared_pks = set(rows)
+
+
+@receiver(m2m_changed, sender=Event.members.through)
+def update_membership_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+        Обработчик сигнала m2m_changed для участников событий.
+
+        Сбрасывает закешированные множества событий пользователей при
+        добавлении, удалении и очистке участников.
+
+        Args:
+            sender: Промежуточная модель Event.members.
+            instance: Событие (или пользователь, если изменение идет с обратной стороны).
+            action (str): Тип изменения (post_add, post_remove, pre_clear, post_clear и т.д.).
+            reverse (bool): True, если изменение выполнено через user.participation_in_events.
+            pk_set (set): Идентификаторы добавленных или удаленных объектов.
+            **kwargs: Дополнительные аргументы.
+
+    """
+    if action in ('post_add', 'post_remove'):
+        invalidate_user_event_ids([instance.pk] if reverse else pk_set)
+    elif action == 'post_clear':
+        invalidate_user_event_ids([instance.pk] if reverse else getattr(instance, '_cleared_pks', ()))
+
+
+@receiver(m2m_changed, sender=Event.members.through)
+def update_membership_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+        Обработчик сигнала m2m_changed, обновляющий накопительную статистику.
+
+        Args:
+            sender: Промежуточная модель Event.members.
+            instance: Событие (или пользователь, если изменение идет с обратной стороны).
+            action (str): Тип изменения.
+            reverse (bool): True, если изменение выполнено через user.participation_in_events.
+            pk_set (set): Идентификаторы добавленных или удаленных объектов.
+            **kwargs: Дополнительные аргументы.
+
+    """
+    if action == 'post_add':
+        record_membership_changes(membership_pairs(instance, reverse, pk_set), joined=True)
+    elif action == 'post_remove':
+        record_membership_changes(membership_pairs(instance, reverse, pk_set), joined=False)
+    elif action == 'post_clear':
+        record_membership_changes(membership_pairs(instance, reverse, getattr(instance, '_cleared_pks', ())), joined=False)
+
+
+@receiver(m2m_changed, sender=Event.members.through)
+def mark_recommendations_dirty(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+        Обработчик сигнала m2m_changed, помечающий рекомендации пользователей для пересчета.
+
+        Args:
+            sender: Промежуточная модель Event.members.
+            instance: Событие (или пользователь, если изменение идет с обратной стороны).
+            action (str): Тип изменения.
+            reverse (bool): True, если изменение выполнено через user.participation_in_events.
+            pk_set (set): Идентификаторы добавленных или удаленных объектов.
+            **kwargs: Дополнительные аргументы.
+
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if reverse:
+            mark_dirty([instance.pk])
+        else:
+            mark_dirty(pk_set if action != 'post_clear' else getattr(instance, '_cleared_pks', ()))
+
+
+@receiver(m2m_changed, sender=Event.members.through)
+def log_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+        Обработчик сигнала m2m_changed, записывающий изменения участников в журнал изменений.
+
+        Args:
+            sender: Промежуточная модель Event.members.
+            instance: Событие (или пользователь, если изменение идет с обратной стороны).
+            action (str): Тип изменения.
+            reverse (bool): True, если изменение выполнено через user.participation_in_events.
+            pk_set (set): Идентификаторы добавленных или удаленных объектов.
+            **kwargs: Дополнительные аргументы.
+
+    """
+    if action == 'post_add':
+        log_membership_changes(membership_pairs(instance, reverse, pk_set))
+    elif action == 'post_remove':
+        log_membership_changes(membership_pairs(instance, reverse, pk_set), deleted=True)
+    elif action == 'post_clear':
+        log_membership_changes(membership_pairs(instance, reverse, getattr(instance, '_cleared_pks', ())), deleted=True)
+
+
+@receiver(post_save, sender=Event)
+def log_event_saved(sender, instance, **kwargs):
+    """
+        Обработчик сигнала post_save для модели Event, записывающий изменение в журнал изменений.
+
+        Args:
+            sender: Класс модели, отправивший сигнал (Event в данном случае).
+            instance: Сохраненный экземпляр модели Event.
+            **kwargs: Дополнительные аргументы.
+
+    """
+    log_event_changes([instance.pk])
+
+
+@receiver(post_delete, sender=Event)
+def log_event_deleted(sender, instance, **kwargs):
+    """
+        Обработчик сигнала post_delete для модели Event, записывающий удаление (tombstone) в журнал изменений.
+
+        Args:
+            sender: Класс модели, отправивший сигнал (Event в данном случае).
+            instance: Удаленный экземпляр модели Event.
+            **kwargs: Дополнительные аргументы.
+
+    """
+    log_event_changes([instance.pk], deleted=True)
+
+
+@receiver(post_save, sender=Event)
+def update_creator_stats(sender, instance, created, **kwargs):
+    """
+        Обработчик сигнала post_save для модели Event.
+
+        Учитывает новое событие в статистике его создателя.
+
+        Args:
+            sender: Класс модели, отправивший сигнал (Event в данном случае).
+            instance: Сохраненный экземпляр модели Event.
+            created (bool): True, если событие было создано.
+            **kwargs: Дополнительные аргументы.
+
+    """
+    if created:
+        record_events_created([instance.creator_id])
+
+
+@receiver(pre_delete, sender=Event)
+def remove_deleted_event(sender, instance, **kwargs):
+    """
+        Обработчик сигнала pre_delete для модели Event.
+
+        Сбрасывает закешированные множества событий его участников
+        и вычитает его из статистики создателя.
 
         Args:
             sender: Класс модели, отправивший сигнал (Event в данном случае).
-            instance: Экземпляр модели Event, который будет сохранен.
+            instance: Удаляемый экземпляр модели Event.
             **kwargs: Дополнительные аргументы.
 
     """
-    if not instance.creator:
-        user_model = get_user_model()
-        instance.creator = user_model.objects.get(pk=instance.user_id)
+    invalidate_user_event_ids(instance.members.values_list('pk', flat=True))
+    record_event_deleted(instance)
@@ -0,0 +1,114 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Event, EventStats, CreatorStats, EventDailyStats, DailyStats
+
+_local = threading.local()
+
+
+def _increment(model, lookup, **deltas):
+    """
+        Атомарно увеличивает счетчики строки накопительной таблицы, создавая ее при отсутствии.
+
+        Args:
+            model: Модель накопительной таблицы.
+            lookup (dict): Поля, однозначно определяющие строку.
+            **deltas: Приращения счетчиков.
+
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Строку успел создать параллельный запрос
+        model.objects.filter(**lookup).update(**updates)
+
+
+def record_membership_changes(pairs, joined):
+    """
+        Учитывает присоединения или выходы участников в накопительных таблицах.
+
+        Args:
+            pairs: Итерируемый объект пар (id события, id пользователя).
+            joined (bool): True для присоединений, False для выходов.
+
+    """
+    per_event = Counter(event_id for event_id, _ in pairs)
+    if not per_event:
+        return
+    sign = 1 if joined else -1
+    today = timezone.localdate()
+    creators = dict(Event.objects.filter(id__in=per_event).values_list('id', 'creator_id'))
+
+    per_creator = Counter()
+    for event_id, count in per_event.items():
+        if joined:
+            _increment(EventDailyStats, {'event_id': event_id, 'date': today}, joins=count)
+        else:
+            _increment(EventDailyStats, {'event_id': event_id, 'date': today}, leaves=count)
+        if event_id in creators:
+            _increment(EventStats, {'event_id': event_id}, members_count=sign * count)
+            per_creator[creators[event_id]] += count
+
+    for creator_id, count in per_creator.items():
+        _increment(CreatorStats, {'creator_id': creator_id}, members_count=sign * count)
+    total = sum(per_event.values())
+    if joined:
+        _increment(DailyStats, {'date': today}, joins=total)
+    else:
+        _increment(DailyStats, {'date': today}, leaves=total)
+
+
+def record_events_created(creator_ids):
+    """
+        Учитывает созданные события в статистике создателей.
+
+        Args:
+            creator_ids: Идентификаторы создателей (по одному на каждое событие).
+
+    """
+    for creator_id, count in Counter(creator_ids).items():
+        _increment(CreatorStats, {'creator_id': creator_id}, events_count=count)
+
+
+@contextmanager
+def archiving():
+    """
+        Отмечает удаление событий в текущем потоке как перенос в архив.
+
+        Архивированные события остаются в статистике создателей, поэтому
+        внутри блока record_event_deleted ничего не вычитает.
+
+    """
+    _local.archiving = True
+    try:
+        yield
+    finally:
+        _local.archiving = False
+
+
+def record_event_deleted(event):
+    """
+        Вычитает удаляемое событие и его участников из статистики создателя.
+
+        При переносе события в архив (см. archiving) статистика не меняется.
+
+        Args:
+            event (Event): Удаляемое событие (вызывается до удаления строки статистики).
+
+    """
+    if getattr(_local, 'archiving', False):
+        return
+    members_count = EventStats.objects.filter(event_id=event.pk).values_list('members_count', flat=True).first() or 0
+    _increment(CreatorStats, {'creator_id': event.creator_id}, events_count=-1, members_count=-members_count)
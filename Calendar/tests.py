@@ -1,3 +1,392 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Calendar_Of_Events.middleware import accepts_gzip
+from .bulk import bulk_add_members
+from .members import get_members_page
+from .membership import get_user_event_ids, _cache_key
+from .models import Event, EventStats, CreatorStats, DailyStats, ChangeLogEntry, EventRecommendation
+from .recommendations import load_graph, score_users, refresh
+from users.models import CustomUser
+
+
+def create_user(username, **extra_fields):
+    return CustomUser.objects.create_user(username, None, first_name=username, last_name='Test', **extra_fields)
+
+
+class StatsTestCase(TestCase):
+    """
+        Накопительная статистика по событиям и создателям.
+    """
+
+    def setUp(self):
+        self.creator = create_user('creator')
+        self.users = [create_user(f'user{i}') for i in range(3)]
+        self.event = Event.objects.create(title='Событие', text='Текст', creator=self.creator)
+
+    def event_members(self, event=None):
+        return EventStats.objects.get(event=event or self.event).members_count
+
+    def creator_stats(self):
+        stats = CreatorStats.objects.get(creator=self.creator)
+        return stats.events_count, stats.members_count
+
+    def test_create_event(self):
+        self.assertEqual(self.creator_stats(), (1, 0))
+
+    def test_join(self):
+        self.event.members.add(*self.users)
+        self.assertEqual(self.event_members(), 3)
+        self.assertEqual(self.creator_stats(), (1, 3))
+        self.assertEqual(DailyStats.objects.get(date=timezone.localdate()).joins, 3)
+
+    def test_join_reverse(self):
+        self.users[0].participation_in_events.add(self.event)
+        self.assertEqual(self.event_members(), 1)
+        self.assertEqual(self.creator_stats(), (1, 1))
+
+    def test_join_twice(self):
+        self.event.members.add(self.users[0])
+        self.event.members.add(self.users[0])
+        self.assertEqual(self.event_members(), 1)
+
+    def test_leave(self):
+        self.event.members.add(*self.users)
+        self.event.members.remove(self.users[0])
+        self.assertEqual(self.event_members(), 2)
+        self.assertEqual(self.creator_stats(), (1, 2))
+        self.assertEqual(DailyStats.objects.get(date=timezone.localdate()).leaves, 1)
+
+    def test_clear(self):
+        self.event.members.add(*self.users)
+        self.event.members.clear()
+        self.assertEqual(self.event_members(), 0)
+        self.assertEqual(self.creator_stats(), (1, 0))
+
+    def test_clear_reverse(self):
+        other = Event.objects.create(title='Другое', text='Текст', creator=self.creator)
+        self.users[0].participation_in_events.add(self.event, other)
+        self.users[0].participation_in_events.clear()
+        self.assertEqual(self.event_members(), 0)
+        self.assertEqual(self.event_members(other), 0)
+        self.assertEqual(self.creator_stats(), (2, 0))
+
+    def test_delete(self):
+        other = Event.objects.create(title='Другое', text='Текст', creator=self.creator)
+        self.event.members.add(*self.users)
+        other.members.add(self.users[0])
+        self.event.delete()
+        self.assertEqual(self.creator_stats(), (1, 1))
+
+    def test_archive_keeps_creator_stats(self):
+        self.event.members.add(*self.users)
+        Event.objects.create(title='Новое', text='Текст', creator=self.creator)
+        Event.objects.filter(id=self.event.id).update(date_creation=timezone.now() - timedelta(days=400))
+        call_command('archive_events', days=365, stdout=StringIO())
+        self.assertFalse(Event.objects.filter(id=self.event.id).exists())
+        self.assertEqual(self.creator_stats(), (2, 3))
+
+    def test_bulk_create(self):
+        client = APIClient()
+        client.force_authenticate(self.creator)
+        response = client.post('/api/events/bulk-create/', [
+            {'title': 'Первое', 'text': 'Текст', 'members': [self.users[0].id, self.users[0].id, self.users[1].id]},
+            {'title': 'Второе', 'text': 'Текст', 'members': [self.users[2].id]},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data[0]['members'], [self.users[0].id, self.users[1].id])
+        self.assertEqual(self.event_members(Event.objects.get(id=response.data[0]['id'])), 2)
+        self.assertEqual(self.event_members(Event.objects.get(id=response.data[1]['id'])), 1)
+        self.assertEqual(self.creator_stats(), (3, 3))
+
+    def test_rebuild_stats(self):
+        other = Event.objects.create(title='Другое', text='Текст', creator=self.users[0])
+        self.event.members.add(*self.users)
+        other.members.add(self.creator)
+        self.event.members.remove(self.users[1])
+        expected = sorted(CreatorStats.objects.values_list('creator_id', 'events_count', 'members_count'))
+
+        CreatorStats.objects.update(events_count=0, members_count=0)
+        EventStats.objects.update(members_count=0)
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(sorted(CreatorStats.objects.values_list('creator_id', 'events_count', 'members_count')), expected)
+        self.assertEqual(self.event_members(), 2)
+        self.assertEqual(self.event_members(other), 1)
+
+    def test_rebuild_stats_counts_archived_events(self):
+        self.event.members.add(*self.users)
+        Event.objects.filter(id=self.event.id).update(date_creation=timezone.now() - timedelta(days=400))
+        call_command('archive_events', days=365, stdout=StringIO())
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(self.creator_stats(), (1, 3))
+
+
+class SyncTestCase(TestCase):
+    """
+        Журнал изменений и дельта-синхронизация /api/sync/.
+    """
+
+    def setUp(self):
+        self.creator = create_user('creator')
+        self.user = create_user('user')
+        self.client = APIClient()
+
+    def sync(self, since, **params):
+        return self.client.get('/api/sync/', {'since': since, **params})
+
+    def current_cursor(self):
+        return self.client.get('/api/sync/').data['cursor']
+
+    def test_changes_after_cursor(self):
+        cursor = self.current_cursor()
+        event = Event.objects.create(title='Событие', text='Текст', creator=self.creator)
+        event.members.add(self.user)
+
+        data = self.sync(cursor).data
+        self.assertEqual([item['id'] for item in data['events']], [event.id])
+        self.assertEqual(data['joined'], [[event.id, self.user.id]])
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['cursor'], self.current_cursor())
+
+        data = self.sync(data['cursor']).data
+        self.assertEqual((data['events'], data['joined'], data['deleted_events']), ([], [], []))
+
+    def test_has_more(self):
+        cursor = self.current_cursor()
+        events = [Event.objects.create(title=f'Событие {i}', text='Текст', creator=self.creator) for i in range(3)]
+
+        first = self.sync(cursor, limit=2).data
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['events']), 2)
+        second = self.sync(first['cursor'], limit=2).data
+        self.assertFalse(second['has_more'])
+        self.assertEqual([item['id'] for item in first['events'] + second['events']], [event.id for event in events])
+
+    def test_leave_is_reported(self):
+        event = Event.objects.create(title='Событие', text='Текст', creator=self.creator)
+        event.members.add(self.user)
+        cursor = self.current_cursor()
+        event.members.remove(self.user)
+        data = self.sync(cursor).data
+        self.assertEqual((data['joined'], data['left']), ([], [[event.id, self.user.id]]))
+
+    def test_deleted_event_is_tombstone(self):
+        cursor = self.current_cursor()
+        event = Event.objects.create(title='Событие', text='Текст', creator=self.creator)
+        event.members.add(self.user)
+        event_id = event.id
+        event.delete()
+
+        data = self.sync(cursor).data
+        self.assertEqual(data['events'], [])
+        self.assertEqual(data['deleted_events'], [event_id])
+        self.assertEqual((data['joined'], data['left']), ([], []))
+
+    def test_event_deleted_after_page(self):
+        cursor = self.current_cursor()
+        event = Event.objects.create(title='Событие', text='Текст', creator=self.creator)
+        event.members.add(self.user)
+        # Удаление попадает в журнал после выбранной страницы
+        Event.objects.filter(id=event.id).delete()
+
+        data = self.sync(cursor, limit=2).data
+        self.assertEqual(data['deleted_events'], [event.id])
+        self.assertEqual(data['joined'], [])
+
+    def test_expired_cursor(self):
+        cursor = self.current_cursor()
+        for i in range(3):
+            Event.objects.create(title=f'Событие {i}', text='Текст', creator=self.creator)
+        ChangeLogEntry.objects.update(date_created=timezone.now() - timedelta(days=60))
+        Event.objects.create(title='Новое', text='Текст', creator=self.creator)
+
+        call_command('prune_changelog', days=30, stdout=StringIO())
+        self.assertEqual(ChangeLogEntry.objects.count(), 1)
+        response = self.sync(cursor)
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.data['resync'])
+        self.assertEqual(self.sync(self.current_cursor()).status_code, 200)
+
+
+class MembershipCacheTestCase(TransactionTestCase):
+    """
+        Кеш множеств событий пользователей.
+
+        TransactionTestCase: обработчики transaction.on_commit выполняются
+        только после настоящей фиксации транзакции.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.creator = create_user('creator')
+        self.user = create_user('user')
+        self.event = Event.objects.create(title='Событие', text='Текст', creator=self.creator)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def cached(self):
+        return cache.get(_cache_key(self.user.id))
+
+    def test_lazy_load(self):
+        self.assertIsNone(self.cached())
+        self.assertEqual(get_user_event_ids(self.user), set())
+        self.assertEqual(self.cached(), set())
+
+    def test_join_and_leave(self):
+        get_user_event_ids(self.user)
+        self.assertEqual(self.client.put(f'/api/events/join/{self.event.id}/').status_code, 200)
+        self.assertEqual(get_user_event_ids(self.user), {self.event.id})
+        self.assertEqual(self.client.put(f'/api/events/join/{self.event.id}/').status_code, 400)
+
+        self.assertEqual(self.client.put(f'/api/events/leave/{self.event.id}/').status_code, 200)
+        self.assertEqual(get_user_event_ids(self.user), set())
+        self.assertEqual(self.client.put(f'/api/events/leave/{self.event.id}/').status_code, 400)
+
+    def test_clear(self):
+        other = Event.objects.create(title='Другое', text='Текст', creator=self.creator)
+        self.event.members.add(self.user)
+        other.members.add(self.user)
+        self.assertEqual(get_user_event_ids(self.user), {self.event.id, other.id})
+        self.event.members.clear()
+        self.assertEqual(get_user_event_ids(self.user), {other.id})
+        self.user.participation_in_events.clear()
+        self.assertEqual(get_user_event_ids(self.user), set())
+
+    def test_delete_event(self):
+        self.event.members.add(self.user)
+        self.assertEqual(get_user_event_ids(self.user), {self.event.id})
+        self.event.delete()
+        self.assertEqual(get_user_event_ids(self.user), set())
+
+    def test_bulk_add_members(self):
+        self.assertEqual(get_user_event_ids(self.user), set())
+        bulk_add_members([(self.event.id, self.user.id)])
+        self.assertEqual(get_user_event_ids(self.user), {self.event.id})
+
+    def test_not_cached_inside_atomic_block(self):
+        with transaction.atomic():
+            self.assertEqual(get_user_event_ids(self.user), set())
+            self.assertIsNone(self.cached())
+        get_user_event_ids(self.user)
+        self.assertEqual(self.cached(), set())
+
+    def test_rollback(self):
+        get_user_event_ids(self.user)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.event.members.add(self.user)
+                self.assertEqual(get_user_event_ids(self.user), {self.event.id})
+                raise RuntimeError
+        self.assertEqual(get_user_event_ids(self.user), set())
+        self.assertEqual(self.client.put(f'/api/events/join/{self.event.id}/').status_code, 200)
+
+    def test_invalidated_again_on_commit(self):
+        with transaction.atomic():
+            self.event.members.add(self.user)
+            # Параллельный запрос мог закешировать состояние до фиксации
+            cache.set(_cache_key(self.user.id), set())
+        self.assertIsNone(self.cached())
+        self.assertEqual(get_user_event_ids(self.user), {self.event.id})
+
+
+class MembersPageTestCase(TestCase):
+    """
+        Постраничный список участников события и поиск по имени.
+    """
+
+    def setUp(self):
+        self.creator = create_user('creator')
+        self.event = Event.objects.create(title='Событие', text='Текст', creator=self.creator)
+        names = [('Иван', 'Петров'), ('Петр', 'Иванов'), ('Анна', 'Смирнова'), ('ивар', 'Орлов')]
+        self.users = [
+            CustomUser.objects.create_user(f'member{i}', None, first_name=first_name, last_name=last_name)
+            for i, (first_name, last_name) in enumerate(names)
+        ]
+        self.event.members.add(*self.users)
+        Event.objects.create(title='Другое', text='Текст', creator=self.creator).members.add(self.creator)
+
+    def collect(self, query='', limit=1):
+        ids, after = [], 0
+        while after is not None:
+            page, after = get_members_page(self.event.id, after, limit, query)
+            ids.extend(member['id'] for member in page)
+        return ids
+
+    def test_pages(self):
+        self.assertEqual(self.collect(), [user.id for user in self.users])
+        page, after = get_members_page(self.event.id, 0, 2)
+        self.assertEqual([member['id'] for member in page], [self.users[0].id, self.users[1].id])
+        self.assertEqual(after, self.users[1].id)
+
+    def test_search_first_and_last_name(self):
+        # "Иванов" совпадает по фамилии, "Иван" и "ивар" - по имени, без учета регистра
+        expected = [self.users[0].id, self.users[1].id, self.users[3].id]
+        self.assertEqual(self.collect('ИВ'), expected)
+        self.assertEqual(self.collect(' ив ', limit=10), expected)
+
+    def test_search_only_event_members(self):
+        self.assertEqual(self.collect('creator'), [])
+        self.assertEqual(self.collect('Смир'), [self.users[2].id])
+
+
+class RecommendationsTestCase(TestCase):
+    """
+        Рекомендации событий по совместному участию.
+    """
+
+    def setUp(self):
+        self.users = [create_user(f'user{i}') for i in range(6)]
+        self.events = [Event.objects.create(title=f'Событие {i}', text='Текст', creator=self.users[0]) for i in range(4)]
+        a, b, c, d, e, f = self.users
+        self.events[0].members.add(a, b, c)
+        self.events[1].members.add(b, c)
+        self.events[2].members.add(c)
+        # Массовое событие: через него соучастники не ищутся
+        self.events[3].members.add(a, d, e, f)
+
+    def test_scores(self):
+        a, b, c = self.users[:3]
+        scored = score_users(load_graph(max_event_members=3), [a.id], top_k=10)[a.id]
+        self.assertEqual([event_id for event_id, _ in scored], [self.events[1].id, self.events[2].id])
+        self.assertGreater(scored[0][1], scored[1][1])
+
+    def test_incremental_graph_matches_full(self):
+        user_ids = [user.id for user in self.users]
+        full = score_users(load_graph(max_event_members=3), user_ids, top_k=10)
+        for user_id in user_ids:
+            self.assertEqual(score_users(load_graph([user_id], max_event_members=3), [user_id], top_k=10).get(user_id),
+                             full.get(user_id))
+
+    def test_large_events_are_not_loaded(self):
+        graph = load_graph([self.users[0].id], max_event_members=3)
+        self.assertNotIn(self.users[3].id, graph.user_ids)
+        self.assertFalse(graph.small[list(graph.event_ids).index(self.events[3].id)])
+
+    def test_refresh(self):
+        a = self.users[0]
+        refresh([a.id], max_event_members=3)
+        self.assertEqual(
+            list(EventRecommendation.objects.filter(user=a).order_by('-score').values_list('event_id', flat=True)),
+            [self.events[1].id, self.events[2].id],
+        )
+
+
+class AcceptEncodingTestCase(TestCase):
+    """
+        Выбор сжатой копии статики по заголовку Accept-Encoding.
+    """
+
+    def test_accepts_gzip(self):
+        for header in ('gzip', 'gzip, deflate, br', 'br, gzip;q=0.8', '*', 'GZIP'):
+            self.assertTrue(accepts_gzip(header), header)
+
+    def test_rejects_gzip(self):
+        for header in ('', 'identity', 'gzip;q=0, identity', 'gzip; q=0.0', '*;q=0', '*, gzip;q=0', 'x-gzipped'):
+            self.assertFalse(accepts_gzip(header), header)
@@ -1,11 +1,33 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.conf import settings
 from django.shortcuts import get_object_or_404, render, redirect
-from .models import Event
-from .serializers import EventSerializer
+from django.utils import timezone
+from datetime import timedelta
+from .models import Event, ArchivedEvent, EventStats, CreatorStats, DailyStats, EventRecommendation, ChangeLogEntry
+from .serializers import EventSerializer, ArchivedEventSerializer, EventBulkCreateSerializer, EventSyncSerializer
 from users.serializers import CustomUserSerializer
 from users.models import CustomUser
 from .forms import EventForm
+from .membership import is_member, get_user_event_ids
+from .batch import dispatch_all
+from .changelog import collect_changes, is_cursor_expired
+from .members import get_members_page
+
+
+def include_archived(request):
+    """
+        Проверяет, запрошены ли архивные события параметром ?include_archived=1.
+
+        Args:
+            request (Request): Запрос от клиента.
+
+        Returns:
+            bool: True, если в ответ нужно добавить архивные события.
+
+    """
+    return request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
 
 
 class EventCreateView(generics.CreateAPIView):
@@ -40,18 +62,82 @@ class EventCreateView(generics.CreateAPIView):
         serializer.save(creator=self.request.user)
 
 
+class EventBulkCreateView(generics.CreateAPIView):
+    """
+        Представление для массового создания событий.
+
+        Принимает список событий (не более EVENTS_BULK_CREATE_MAX), создателем
+        всех событий становится текущий пользователь. События вставляются одним
+        bulk_create, участники - пачками в промежуточную таблицу.
+
+        Attributes:
+            serializer_class (Serializer): Сериализатор, используемый для создания событий.
+            permission_classes (list): Список классов разрешений, позволяющих только
+                                       аутентифицированным пользователям создавать события.
+
+        Methods:
+            get_serializer(*args, **kwargs): Возвращает сериализатор списка событий.
+            perform_create(serializer): Сохраняет события с указанным создателем.
+
+    """
+    serializer_class = EventBulkCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['many'] = True
+        kwargs['max_length'] = settings.EVENTS_BULK_CREATE_MAX
+        kwargs['allow_empty'] = False
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        serializer.save(creator=self.request.user)
+
+
 class EventListView(generics.ListAPIView):
     """
         Представление для получения списка всех событий.
 
+        По умолчанию возвращаются только актуальные события. С параметром
+        ?include_archived=1 ответ имеет вид {"events": [...], "archived": [...], "next": курсор},
+        где archived - страница архивных событий по возрастанию id:
+
+        - archived_after: Курсор из поля next предыдущего ответа; с ним поле events не возвращается
+        - archived_limit: Размер страницы архива (не больше ARCHIVED_EVENTS_PAGE_MAX)
+
         Attributes:
             queryset (QuerySet): Запрос к модели Event для получения списка всех событий.
             serializer_class (Serializer): Сериализатор для событий.
 
+        Methods:
+            list(request, *args, **kwargs): Возвращает список событий, при необходимости вместе со страницей архива.
+
     """
     queryset = Event.objects.all()
     serializer_class = EventSerializer
 
+    def list(self, request, *args, **kwargs):
+        if not include_archived(request):
+            return super().list(request, *args, **kwargs)
+        params = request.query_params
+        try:
+            after = int(params.get('archived_after', 0))
+            limit = min(int(params.get('archived_limit', settings.ARCHIVED_EVENTS_PAGE_SIZE)),
+                        settings.ARCHIVED_EVENTS_PAGE_MAX)
+        except ValueError:
+            return Response({"error": "Параметры archived_after и archived_limit должны быть целыми числами"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        limit = max(limit, 1)
+        page = list(ArchivedEvent.objects.filter(id__gt=after).order_by('id').prefetch_related('members')[:limit + 1])
+        next_cursor = page[limit - 1].id if len(page) > limit else None
+        data = {
+            'archived': ArchivedEventSerializer(page[:limit], many=True).data,
+            'next': next_cursor,
+        }
+        if 'archived_after' not in params:
+            data['events'] = self.get_serializer(self.filter_queryset(self.get_queryset()), many=True).data
+        return Response(data)
+
 
 class EventJoinView(generics.UpdateAPIView):
     """
@@ -86,7 +172,7 @@ class EventJoinView(generics.UpdateAPIView):
         """
         event = self.get_object()
         user = request.user
-        if user not in event.members.all():
+        if not is_member(user, event.id):
             event.members.add(user)
             return Response({"message": "Вы присоединились к событию"})
         else:
@@ -126,7 +212,7 @@ class EventLeaveView(generics.UpdateAPIView):
         """
         event = self.get_object()
         user = request.user
-        if user in event.members.all():
+        if is_member(user, event.id):
             event.members.remove(user)
             return Response({"message": "Вы покинули событие"})
         else:
@@ -176,15 +262,29 @@ class EventMembersListView(generics.ListAPIView):
     """
         Представление для получения списка участников события.
 
+        С параметром ?include_archived=1 возвращает участников и для событий из архива.
+        С любым из параметров limit, after, q возвращает страницу участников
+        (id, first_name, last_name) и курсор следующей страницы:
+        {"results": [...], "next": курсор или null}.
+
+        - limit: Размер страницы (не больше MEMBERS_PAGE_MAX)
+        - after: Курсор из поля next предыдущей страницы
+        - q: Начало имени или фамилии участника
+
         Attributes:
             serializer_class (Serializer): Сериализатор для пользователей, участвующих в событии.
 
         Methods:
             get_queryset(): Возвращает список пользователей, участвующих в указанном событии.
+            list(request): Возвращает весь список или страницу участников.
 
     """
     serializer_class = CustomUserSerializer
 
+    def is_archived(self):
+        event_id = self.kwargs['event_id']
+        return include_archived(self.request) and not Event.objects.filter(id=event_id).exists()
+
     def get_queryset(self):
         """
             Возвращает список пользователей, участвующих в указанном событии.
@@ -194,8 +294,192 @@ class EventMembersListView(generics.ListAPIView):
 
             """
         event_id = self.kwargs['event_id']
+        if self.is_archived():
+            return CustomUser.objects.filter(archived_participation_in_events__id=event_id)
         return CustomUser.objects.filter(participation_in_events__id=event_id)
 
+    def list(self, request, *args, **kwargs):
+        params = request.query_params
+        if not any(name in params for name in ('limit', 'after', 'q')):
+            return super().list(request, *args, **kwargs)
+        try:
+            limit = min(int(params.get('limit', settings.MEMBERS_PAGE_SIZE)), settings.MEMBERS_PAGE_MAX)
+            after = int(params.get('after', 0))
+        except ValueError:
+            return Response({"error": "Параметры limit и after должны быть целыми числами"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        members, next_cursor = get_members_page(
+            self.kwargs['event_id'], after, max(limit, 1), params.get('q', ''),
+            model=ArchivedEvent if self.is_archived() else Event,
+        )
+        return Response({'results': members, 'next': next_cursor})
+
+
+class StatsView(APIView):
+    """
+        Представление для получения статистики по событиям.
+
+        Ответ строится только по накопительным таблицам, которые обновляются
+        сигналами, поэтому время ответа не зависит от количества участников.
+
+        Параметры:
+        - days: Количество последних дней для статистики присоединений (по умолчанию 30, максимум 365)
+        - limit: Размер рейтингов событий и создателей (по умолчанию 10, максимум 100)
+
+        Возвращает:
+        - daily: Присоединения и выходы по дням
+        - top_events: События с наибольшим количеством участников
+        - top_creators: Самые активные создатели событий
+
+    """
+
+    def get(self, request, *args, **kwargs):
+        days = self.get_int_param(request, 'days', default=30, maximum=365)
+        limit = self.get_int_param(request, 'limit', default=10, maximum=100)
+
+        since = timezone.localdate() - timedelta(days=days - 1)
+        daily = DailyStats.objects.filter(date__gte=since).order_by('date').values('date', 'joins', 'leaves')
+        top_events = EventStats.objects.order_by('-members_count').values(
+            'event_id', 'event__title', 'members_count'
+        )[:limit]
+        top_creators = CreatorStats.objects.order_by('-events_count', '-members_count').values(
+            'creator_id', 'creator__username', 'events_count', 'members_count'
+        )[:limit]
+
+        return Response({
+            'daily': list(daily),
+            'top_events': [
+                {'id': row['event_id'], 'title': row['event__title'], 'members': row['members_count']}
+                for row in top_events
+            ],
+            'top_creators': [
+                {
+                    'id': row['creator_id'],
+                    'username': row['creator__username'],
+                    'events': row['events_count'],
+                    'members': row['members_count'],
+                }
+                for row in top_creators
+            ],
+        })
+
+    @staticmethod
+    def get_int_param(request, name, default, maximum):
+        try:
+            value = int(request.query_params.get(name, default))
+        except ValueError:
+            value = default
+        return min(max(value, 1), maximum)
+
+
+class RecommendationsView(APIView):
+    """
+        Представление для получения рекомендованных пользователю событий.
+
+        Рекомендации заранее рассчитываются командой build_recommendations.
+        События, к которым пользователь уже присоединился после расчета, исключаются.
+        Просматривать рекомендации может только сам пользователь или сотрудник.
+
+        Возвращает:
+        - Список событий (id, title) с оценкой score по убыванию оценки
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, user_id, *args, **kwargs):
+        if request.user.id != user_id and not request.user.is_staff:
+            return Response({"error": "Нет доступа к рекомендациям этого пользователя"},
+                            status=status.HTTP_403_FORBIDDEN)
+        user = get_object_or_404(CustomUser, id=user_id)
+        joined = get_user_event_ids(user)
+        recommendations = EventRecommendation.objects.filter(user=user).order_by('-score').values(
+            'event_id', 'event__title', 'score'
+        )
+        return Response([
+            {'id': row['event_id'], 'title': row['event__title'], 'score': row['score']}
+            for row in recommendations if row['event_id'] not in joined
+        ])
+
+
+class BatchView(APIView):
+    """
+        Представление для выполнения нескольких запросов к API за один запрос.
+
+        Аутентификация выполняется один раз для пакетного запроса, подзапросы
+        выполняются в текущем процессе от имени того же пользователя.
+        Подзапросы только на чтение при "parallel": true выполняются параллельно.
+
+        Параметры:
+        - requests: Список подзапросов (не более BATCH_MAX_REQUESTS), каждый с полями method, path и body
+        - parallel: Разрешить параллельное выполнение подзапросов на чтение
+
+        Возвращает:
+        - Список ответов подзапросов с полями status и body в порядке подзапросов
+    """
+
+    def post(self, request, *args, **kwargs):
+        items = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return Response({"error": "Ожидается непустой список подзапросов в поле requests"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            return Response({"error": f"Не более {settings.BATCH_MAX_REQUESTS} подзапросов в одном запросе"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        parallel = bool(request.data.get('parallel', False))
+        return Response(dispatch_all(request, items, parallel, settings.BATCH_MAX_WORKERS))
+
+
+class SyncView(APIView):
+    """
+        Представление для дельта-синхронизации событий и участников.
+
+        Возвращает только изменения из журнала после переданного курсора, поэтому
+        объем ответа зависит от количества изменений, а не от размера базы.
+        Без параметра since возвращает текущий курсор: клиент загружает полный
+        список событий и дальше синхронизируется от этого курсора. Если записи
+        журнала после курсора уже удалены (prune_changelog), возвращается
+        код 410 с полем resync: клиент должен заново получить курсор и полный список.
+
+        Параметры:
+        - since: Курсор из предыдущего ответа
+        - limit: Максимальное количество записей журнала за один ответ (по умолчанию и максимум SYNC_MAX_CHANGES)
+
+        Возвращает:
+        - cursor: Курсор для следующего запроса
+        - has_more: Есть ли еще изменения после cursor
+        - events: Измененные и созданные события
+        - deleted_events: Идентификаторы удаленных событий
+        - joined, left: Пары [id события, id пользователя] присоединений и выходов
+    """
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        if since is None:
+            latest = ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first()
+            return Response({'cursor': latest or 0})
+        try:
+            since = int(since)
+            limit = min(int(request.query_params.get('limit', settings.SYNC_MAX_CHANGES)), settings.SYNC_MAX_CHANGES)
+        except ValueError:
+            return Response({"error": "Параметры since и limit должны быть целыми числами"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if is_cursor_expired(since):
+            return Response({"error": "Курсор устарел, требуется полная синхронизация", "resync": True},
+                            status=status.HTTP_410_GONE)
+
+        changes = collect_changes(since, max(limit, 1))
+        changed_ids = changes.pop('changed_events')
+        events = EventSyncSerializer(Event.objects.filter(id__in=changed_ids), many=True).data
+        # Событие могло быть удалено после последней записи в выборке
+        found = {event['id'] for event in events}
+        missing = {event_id for event_id in changed_ids if event_id not in found}
+        if missing:
+            changes['deleted_events'] += sorted(missing)
+            changes['joined'] = [pair for pair in changes['joined'] if pair[0] not in missing]
+            changes['left'] = [pair for pair in changes['left'] if pair[0] not in missing]
+        return Response({**changes, 'events': events})
+
 
 def event_list(request):
     """
@@ -208,13 +492,8 @@ def event_list(request):
             HttpResponse: HTML-страница со списком событий.
 
     """
-    if request.user.is_authenticated:
-        events = Event.objects.all()
-        participating_events = request.user.participation_in_events.all()
-        return render(request, 'main/index.html', {'events': events, 'participating_events': participating_events})
-    else:
-        events = Event.objects.all()
-        return render(request, 'main/index.html', {'events': events})
+    events = Event.objects.all()
+    return render(request, 'main/index.html', {'events': events})
 
 
 def user_profile(request, user_id):
@@ -246,6 +525,10 @@ def event_detail(request, event_id):
     """
         Представление для отображения подробной информации о событии.
 
+        Участники выводятся постранично (MEMBERS_PAGE_SIZE на страницу):
+        параметр ?after= - курсор следующей страницы, ?q= - поиск по началу
+        имени или фамилии.
+
         Args:
             request (HttpRequest): Запрос от клиента.
             event_id (int): Идентификатор события.
@@ -256,13 +539,21 @@ def event_detail(request, event_id):
     """
     event = get_object_or_404(Event, id=event_id)
     events = Event.objects.all()
-    if request.user.is_authenticated:
-        participating_events = request.user.participation_in_events.all()
-        return render(request, 'events/event_detail.html',
-                      {'event': event, 'events': events, 'participating_events': participating_events})
-    else:
-        events = Event.objects.all()
-        return render(request, 'events/event_detail.html', {'event': event, 'events': events})
+    query = request.GET.get('q', '').strip()
+    try:
+        after = int(request.GET.get('after', 0))
+    except ValueError:
+        after = 0
+    members, next_cursor = get_members_page(event.id, after, settings.MEMBERS_PAGE_SIZE, query)
+    return render(request, 'events/event_detail.html', {
+        'event': event,
+        'events': events,
+        'members': members,
+        'members_next': next_cursor,
+        'members_after': after,
+        'members_query': query,
+        'members_page_size': settings.MEMBERS_PAGE_SIZE,
+    })
 
 
 def join_event(request, event_id):
@@ -278,9 +569,8 @@ def join_event(request, event_id):
 
     """
     event = get_object_or_404(Event, id=event_id)
-    if request.user not in event.members.all():
+    if not is_member(request.user, event.id):
         event.members.add(request.user)
-    event_detail(request, event_id)
     return redirect('Calendar:event_detail', event_id=event.id)
 
 
@@ -297,9 +587,8 @@ def leave_event(request, event_id):
 
     """
     event = get_object_or_404(Event, id=event_id)
-    if request.user in event.members.all():
+    if is_member(request.user, event.id):
         event.members.remove(request.user)
-    event_detail(request, event_id)
     return redirect('Calendar:event_detail', event_id=event.id)
 
 
@@ -342,5 +631,4 @@ def create_event(request):
     else:
         form = EventForm()
     events = Event.objects.all()
-    participating_events = request.user.participation_in_events.all()
-    return render(request, 'events/create_event.html', {'form': form, 'events': events, 'participating_events': participating_events})
+    return render(request, 'events/create_event.html', {'form': form, 'events': events})
@@ -2,6 +2,8 @@
 ASGI config for Calendar_Of_Events project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+With WARMUP_ON_STARTUP enabled the URLconf, templates and database connections
+are warmed up before the first request.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -14,3 +16,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Calendar_Of_Events.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_STARTUP:
+    from .warmup import warm_up
+    warm_up()
@@ -0,0 +1,36 @@
+"""
+gunicorn configuration for Calendar_Of_Events project.
+
+The application is imported and warmed up once in the master process
+(preload_app), then forked into workers that share the loaded code and
+compiled templates. Workers are recycled gracefully after max_requests.
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Calendar_Of_Events.settings_production')
+
+wsgi_app = 'Calendar_Of_Events.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+preload_app = True
+
+# Graceful recycling: a worker finishes in-flight requests and is replaced
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+graceful_timeout = 30
+timeout = 30
+
+
+def pre_fork(server, worker):
+    # Database connections opened in the master must not be shared with workers
+    from django.db import connections
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    from django.db import connections
+    for connection in connections.all():
+        connection.ensure_connection()
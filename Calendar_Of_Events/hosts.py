@@ -0,0 +1,20 @@
+from django.conf import settings
+
+
+def allowed_host():
+    """
+        Возвращает имя хоста, разрешенное ALLOWED_HOSTS, для запросов тестового клиента.
+
+        Тестовый клиент по умолчанию отправляет Host: testserver, который вне
+        тестов отклоняется с DisallowedHost (код 400). При пустом ALLOWED_HOSTS
+        и DEBUG = True Django разрешает localhost.
+
+        Returns:
+            str: Имя хоста.
+
+    """
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'localhost'
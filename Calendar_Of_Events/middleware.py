@@ -0,0 +1,386 @@
+import cProfile
+import json
+import mimetypes
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+
+def accepts_gzip(header):
+    """
+        Проверяет по заголовку Accept-Encoding, принимает ли клиент gzip.
+
+        Учитываются веса q: кодировка с q=0 запрещена, "*" разрешает gzip,
+        если он не указан явно.
+
+        Args:
+            header (str): Значение заголовка Accept-Encoding.
+
+        Returns:
+            bool: True, если можно отдать сжатую копию.
+
+    """
+    weights = {}
+    for item in header.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+    return weights.get('gzip', weights.get('*', 0.0)) > 0
+
+
+class StaticFilesMiddleware:
+    """
+        Отдача собранной статики (STATIC_ROOT) в production.
+
+        Список файлов строится один раз при старте процесса, поэтому запрос к
+        статике не обращается к файловой системе для поиска. Файлы с хешем
+        содержимого в имени (из манифеста collectstatic) отдаются с
+        Cache-Control: immutable на год, остальные - с коротким сроком кеширования.
+        Если клиент поддерживает gzip и рядом с файлом есть сжатая копия .gz,
+        отдается она.
+
+        При DEBUG = True не используется: статику отдает runserver.
+
+        Attributes:
+            immutable_max_age (int): Срок кеширования файлов с хешем в имени (в секундах).
+            default_max_age (int): Срок кеширования остальных файлов (в секундах).
+
+    """
+    immutable_max_age = 60 * 60 * 24 * 365
+    default_max_age = 60
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+        self.files = self.scan(settings.STATIC_ROOT)
+
+    def scan(self, root):
+        """
+            Строит индекс собранных файлов.
+
+            Args:
+                root (str): Каталог STATIC_ROOT.
+
+            Returns:
+                dict: Имя файла -> (путь, размер, время изменения, (путь, размер) копии .gz или None, неизменяемый ли файл).
+
+        """
+        immutable = set()
+        manifest = os.path.join(root, 'staticfiles.json')
+        if os.path.exists(manifest):
+            with open(manifest, encoding='utf-8') as stream:
+                immutable.update(json.load(stream).get('paths', {}).values())
+
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith('.gz'):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                stat = os.stat(path)
+                gz = (path + '.gz', os.path.getsize(path + '.gz')) if os.path.exists(path + '.gz') else None
+                files[name] = (path, stat.st_size, stat.st_mtime, gz, name in immutable)
+        return files
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            entry = self.files.get(request.path[len(self.prefix):])
+            if entry is not None:
+                return self.serve(request, *entry)
+        return self.get_response(request)
+
+    def serve(self, request, path, size, mtime, gz, immutable):
+        """
+            Формирует ответ с файлом статики.
+        """
+        last_modified = http_date(mtime)
+        if request.META.get('HTTP_IF_MODIFIED_SINCE') == last_modified:
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(path)
+            encoding = None
+            if gz and accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+                (path, size), encoding = gz, 'gzip'
+            response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+            # FileResponse берет имя из открытого файла (для сжатой копии - *.gz), статике оно не нужно
+            response.headers.pop('Content-Disposition', None)
+            response['Content-Length'] = size
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['Last-Modified'] = last_modified
+        if immutable:
+            response['Cache-Control'] = f'public, max-age={self.immutable_max_age}, immutable'
+        else:
+            response['Cache-Control'] = f'public, max-age={self.default_max_age}'
+        if gz:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class TrafficCaptureMiddleware:
+    """
+        Запись части реальных запросов в JSONL для последующего воспроизведения.
+
+        Доля записываемых запросов задается TRAFFIC_CAPTURE_RATE (от 0 до 1), файл -
+        TRAFFIC_CAPTURE_FILE. При нулевой доле не используется. Для каждого запроса
+        сохраняются метод, путь, имя маршрута, пользователь, тело, код ответа и
+        время обработки. Значения полей паролей в теле заменяются звездочками.
+        Записанный трафик воспроизводится командой replay_traffic.
+
+        Attributes:
+            masked_fields (tuple): Поля тела запроса, значения которых не записываются.
+
+    """
+    masked_fields = ('password', 'password1', 'password2')
+
+    def __init__(self, get_response):
+        if settings.TRAFFIC_CAPTURE_RATE <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.rate = settings.TRAFFIC_CAPTURE_RATE
+        self.lock = threading.Lock()
+        self.stream = open(settings.TRAFFIC_CAPTURE_FILE, 'a', encoding='utf-8')
+
+    def __call__(self, request):
+        if random.random() >= self.rate:
+            return self.get_response(request)
+
+        # Тело читается до вызова представления: после него поток запроса может быть уже прочитан
+        content_type, body = self.read_body(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        user = getattr(request, 'user', None)
+        match = request.resolver_match
+        record = {
+            'ts': time.time(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'url_name': match.view_name if match else None,
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'content_type': content_type,
+            'body': body,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+        }
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+        return response
+
+    def read_body(self, request):
+        """
+            Возвращает тип и тело запроса для записи.
+
+            Формы (в том числе multipart) записываются как urlencoded без файлов.
+            Пустое или слишком большое тело не записывается.
+
+            Returns:
+                tuple: (Content-Type, тело запроса или None).
+
+        """
+        content_type = request.META.get('CONTENT_TYPE', '')
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if not length or length > settings.TRAFFIC_CAPTURE_MAX_BODY:
+            return content_type, None
+        if request.content_type in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+            data = request.POST.copy()
+            for key in self.masked_fields:
+                if key in data:
+                    data[key] = '***'
+            return 'application/x-www-form-urlencoded', data.urlencode()
+        body = request.body.decode('utf-8', errors='replace')
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(body)
+            except ValueError:
+                return content_type, body
+            if isinstance(data, dict):
+                data = {key: '***' if key in self.masked_fields else value for key, value in data.items()}
+            return content_type, json.dumps(data, ensure_ascii=False)
+        return content_type, body
+
+
+PROFILE_TOKEN_SALT = 'Calendar_Of_Events.profiling'
+
+
+def make_profile_token():
+    """
+        Создает подписанный токен, включающий профилирование запроса.
+
+        Токен передается в заголовке X-Profile или параметре ?__profile= и
+        действует PROFILING_TOKEN_MAX_AGE секунд.
+
+        Returns:
+            str: Подписанный токен.
+
+    """
+    return signing.dumps('profile', salt=PROFILE_TOKEN_SALT)
+
+
+class StackSampler:
+    """
+        Статистический профилировщик одного потока.
+
+        Фоновый поток с заданным интервалом снимает стек профилируемого потока
+        через sys._current_frames() и считает одинаковые стеки. Результат
+        записывается в формате collapsed stacks (flamegraph.pl, speedscope).
+
+        Attributes:
+            interval (float): Интервал между снимками стека в секундах.
+            stacks (Counter): Количество снимков каждого стека.
+
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as stream:
+            for stack, count in self.stacks.most_common():
+                stream.write(f'{stack} {count}\n')
+
+
+class SQLTrace:
+    """
+        Запись SQL-запросов, выполненных при обработке запроса, с их длительностью.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'many': many,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+class ProfilingMiddleware:
+    """
+        Профилирование отдельных запросов по требованию.
+
+        Запрос профилируется, если в заголовке X-Profile или параметре ?__profile=
+        передан действующий токен (команда make_profile_token), если сотрудник,
+        вошедший на сайт, передал ?__profile=1, либо случайно с вероятностью
+        PROFILING_SAMPLE_RATE. Для каждого такого запроса в PROFILING_DIR
+        сохраняются стеки (.collapsed при PROFILING_MODE = 'sample' или .prof
+        при 'cprofile') и трасса SQL-запросов (.sql.json).
+
+        При PROFILING_ENABLED = False не используется и не добавляет накладных расходов.
+
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        name = self.profile_name(request)
+        trace = SQLTrace()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(trace))
+            if settings.PROFILING_MODE == 'cprofile':
+                profiler = cProfile.Profile()
+                response = profiler.runcall(self.get_response, request)
+                profiler.dump_stats(os.path.join(settings.PROFILING_DIR, name + '.prof'))
+            else:
+                with StackSampler(settings.PROFILING_SAMPLE_INTERVAL) as sampler:
+                    response = self.get_response(request)
+                sampler.write(os.path.join(settings.PROFILING_DIR, name + '.collapsed'))
+        duration = time.perf_counter() - started
+
+        with open(os.path.join(settings.PROFILING_DIR, name + '.sql.json'), 'w', encoding='utf-8') as stream:
+            json.dump({
+                'method': request.method,
+                'path': request.get_full_path(),
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 3),
+                'queries_count': len(trace.queries),
+                'queries_ms': round(sum(query['duration_ms'] for query in trace.queries), 3),
+                'queries': trace.queries,
+            }, stream, ensure_ascii=False, indent=2)
+        response['X-Profile-Id'] = name
+        return response
+
+    def should_profile(self, request):
+        token = request.META.get('HTTP_X_PROFILE') or request.GET.get('__profile')
+        if token == '1':
+            user = getattr(request, 'user', None)
+            return user is not None and user.is_staff
+        if token:
+            try:
+                signing.loads(token, salt=PROFILE_TOKEN_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+            except signing.BadSignature:
+                return False
+            return True
+        return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def profile_name(self, request):
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        return f'{time.strftime("%Y%m%d-%H%M%S")}-{os.urandom(3).hex()}-{request.method}-{slug[:80]}'
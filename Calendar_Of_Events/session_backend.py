@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+
+class SessionStore(CachedDBStore):
+    """
+        Сессии в кеше с отложенной записью в БД.
+
+        Чтение выполняется из кеша (как в cached_db), поэтому страница не
+        обращается к таблице django_session. Создание сессии (вход, смена ключа)
+        и удаление (выход) сразу записываются в БД. Прочие изменения данных
+        сессии сохраняются в кеш и попадают в БД не чаще одного раза
+        в SESSION_DB_WRITE_INTERVAL секунд, что снимает конкуренцию с записью
+        событий на SQLite.
+
+        Изменения, сделанные после последней записи в БД, теряются при
+        вытеснении сессии из кеша. Данные аутентификации при этом не теряются:
+        они меняются только через создание новой сессии.
+
+    """
+    synced_key_suffix = ':synced'
+
+    @property
+    def synced_key(self):
+        return self.cache_key + self.synced_key_suffix
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None or self._db_write_due():
+            super().save(must_create)
+            self._cache.set(self.synced_key, time.time(), self.get_expiry_age())
+        else:
+            self._cache.set(self.cache_key, self._session, self.get_expiry_age())
+
+    def _db_write_due(self):
+        synced = self._cache.get(self.synced_key)
+        return synced is None or time.time() - synced >= settings.SESSION_DB_WRITE_INTERVAL
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        super().delete(session_key)
+        if key is not None:
+            self._cache.delete(self.cache_key_prefix + key + self.synced_key_suffix)
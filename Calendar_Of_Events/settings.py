@@ -45,11 +45,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'Calendar_Of_Events.middleware.StaticFilesMiddleware',
+    'Calendar_Of_Events.middleware.TrafficCaptureMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'Calendar_Of_Events.middleware.ProfilingMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -68,6 +71,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'Calendar.context_processors.membership',
             ],
         },
     },
@@ -85,6 +89,23 @@ DATABASES = {
     }
 }
 
+# Cache
+# The per-user membership sets are updated from signals, so every worker process
+# must share one cache backend in production (memcached, redis, file-based).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+MEMBERSHIP_CACHE_TIMEOUT = 60 * 60
+
+# Sessions are read from the cache; changes reach the database at most once per interval (seconds)
+
+SESSION_ENGINE = 'Calendar_Of_Events.session_backend'
+SESSION_DB_WRITE_INTERVAL = 5 * 60
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -108,6 +129,57 @@ AUTH_USER_MODEL = 'users.CustomUser'
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'Calendar:index'
 
+# Events older than this many days are moved to the archive tables by archive_events
+
+EVENTS_ARCHIVE_AFTER_DAYS = 365
+
+# Archived events returned per page by /api/events/list/?include_archived=1
+
+ARCHIVED_EVENTS_PAGE_SIZE = 100
+ARCHIVED_EVENTS_PAGE_MAX = 1000
+
+# Maximum number of events accepted by /api/events/bulk-create/ in one request
+
+EVENTS_BULK_CREATE_MAX = 1000
+
+# /api/batch/: maximum sub-requests per call and thread pool size for parallel reads
+
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+# Maximum number of change log entries returned by one /api/sync/ response
+
+SYNC_MAX_CHANGES = 1000
+
+# Change log entries older than this many days are removed by prune_changelog;
+# clients with older /api/sync/ cursors get 410 and must resync
+
+CHANGELOG_RETENTION_DAYS = 30
+
+# Event members shown per page on the event page, and the largest page
+# the members API (/api/events/<id>/members/?limit=) will return
+
+MEMBERS_PAGE_SIZE = 50
+MEMBERS_PAGE_MAX = 500
+
+# Traffic capture for load testing: share of requests written to TRAFFIC_CAPTURE_FILE
+# (0 disables the middleware). Replay the file with the replay_traffic command.
+
+TRAFFIC_CAPTURE_RATE = float(os.environ.get('TRAFFIC_CAPTURE_RATE', 0))
+TRAFFIC_CAPTURE_FILE = os.path.join(BASE_DIR, 'requests.jsonl')
+TRAFFIC_CAPTURE_MAX_BODY = 64 * 1024
+
+# On-demand request profiling (see ProfilingMiddleware). Requests are profiled when
+# they carry a token from make_profile_token, when a staff user adds ?__profile=1,
+# or at random with PROFILING_SAMPLE_RATE. PROFILING_MODE is 'sample' or 'cprofile'.
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+PROFILING_MODE = 'sample'
+PROFILING_SAMPLE_INTERVAL = 0.001
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+PROFILING_DIR = os.path.join(BASE_DIR, 'profiles')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.TokenAuthentication',
@@ -130,6 +202,20 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# With DEBUG off, collectstatic writes content-hashed names and .gz copies,
+# which StaticFilesMiddleware serves with far-future immutable caching.
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'Calendar_Of_Events.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -137,3 +223,8 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 APPEND_SLASH = False
+
+# Warm up URLconf, templates and database connections when the WSGI application is loaded
+# (enabled in settings_production)
+
+WARMUP_ON_STARTUP = False
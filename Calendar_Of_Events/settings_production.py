@@ -0,0 +1,70 @@
+"""
+Production settings for Calendar_Of_Events project.
+
+Extends the development settings: turns DEBUG off, reads secrets and hosts
+from the environment, keeps database connections open between requests,
+enables the cached template loader explicitly, serves hashed and
+precompressed static files and warms each process up at startup.
+
+Run with gunicorn:
+    gunicorn -c Calendar_Of_Events/gunicorn.conf.py
+"""
+
+from .settings import *  # noqa: F401,F403
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Set the DJANGO_SECRET_KEY environment variable for production settings')
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# Templates are compiled once per process and kept by the cached loader
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],  # noqa: F405
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'Calendar.context_processors.membership',
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Persistent connections: each worker reuses its connection across requests
+
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DJANGO_CONN_MAX_AGE', 600))  # noqa: F405
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True  # noqa: F405
+
+# Membership sets and sessions must be shared by all worker processes
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),  # noqa: F405
+    }
+}
+
+STORAGES = {
+    **STORAGES,  # noqa: F405
+    'staticfiles': {
+        'BACKEND': 'Calendar_Of_Events.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+WARMUP_ON_STARTUP = True
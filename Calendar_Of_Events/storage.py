@@ -0,0 +1,58 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+        Хранилище статики с хешем содержимого в имени файла и сжатыми копиями.
+
+        При collectstatic к каждому файлу добавляется хеш содержимого (как в
+        ManifestStaticFilesStorage), а для текстовых файлов рядом сохраняется
+        заранее сжатая копия с расширением .gz. Сжатые копии отдаются
+        StaticFilesMiddleware клиентам, поддерживающим gzip.
+
+        Attributes:
+            compress_extensions (tuple): Расширения файлов, для которых создаются .gz копии.
+            min_compress_size (int): Минимальный размер файла в байтах для сжатия.
+
+    """
+    compress_extensions = ('.css', '.js', '.map', '.svg', '.txt', '.json', '.html', '.xml')
+    min_compress_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = set()
+        for name, hashed_name, was_processed in super().post_process(paths, dry_run, **options):
+            if isinstance(hashed_name, str):
+                processed.update((name, hashed_name))
+            yield name, hashed_name, was_processed
+
+        if dry_run:
+            return
+        for name in sorted(processed):
+            if name.endswith(self.compress_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        """
+            Сохраняет сжатую копию файла рядом с оригиналом.
+
+            Копия не создается, если файл слишком мал или сжатие не уменьшает его размер.
+
+            Args:
+                name (str): Имя файла в хранилище.
+
+        """
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            content = source.read()
+        if len(content) < self.min_compress_size:
+            return
+        # mtime=0 делает результат воспроизводимым между сборками
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) >= len(content):
+            return
+        with open(path + '.gz', 'wb') as target:
+            target.write(compressed)
+        os.utime(path + '.gz', (os.path.getatime(path), os.path.getmtime(path)))
@@ -0,0 +1,86 @@
+"""
+Warm-up of a freshly started process before it serves its first request.
+
+Loads the URLconf, compiles every project template into the cached template
+loader and opens database connections, so that the first request of each
+worker does not pay for them.
+"""
+
+import logging
+import os
+import time
+
+from django.apps import apps
+from django.db import connections
+from django.template import TemplateDoesNotExist, engines
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+
+def template_names():
+    """
+        Возвращает имена всех шаблонов проекта и приложений.
+    """
+    directories = []
+    for engine in engines.all():
+        directories.extend(getattr(engine, 'template_dirs', ()))
+    directories.extend(
+        os.path.join(app_config.path, 'templates') for app_config in apps.get_app_configs()
+    )
+
+    names = set()
+    for directory in directories:
+        for root, _, filenames in os.walk(directory):
+            for filename in filenames:
+                if filename.endswith(('.html', '.txt')):
+                    names.add(os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm_urls():
+    resolver = get_resolver()
+    # reverse() заполняет словари обратного разрешения всех пространств имен
+    resolver.reverse_dict
+    reverse('Calendar:index')
+    return len(resolver.url_patterns)
+
+
+def warm_templates():
+    count = 0
+    for engine in engines.all():
+        for name in template_names():
+            try:
+                engine.get_template(name)
+            except TemplateDoesNotExist:
+                # Шаблон из каталога, который не подключен к этому движку
+                continue
+            except Exception:
+                logger.exception('Не удалось скомпилировать шаблон %s при прогреве', name)
+                continue
+            count += 1
+    return count
+
+
+def warm_database():
+    for connection in connections.all():
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    return len(connections.all())
+
+
+def warm_up():
+    """
+        Прогревает URLconf, шаблоны и соединения с БД.
+
+        Returns:
+            dict: Время каждого этапа прогрева в миллисекундах.
+
+    """
+    timings = {}
+    for stage, func in (('urls', warm_urls), ('templates', warm_templates), ('database', warm_database)):
+        started = time.perf_counter()
+        func()
+        timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+    return timings
@@ -1,17 +1,29 @@
 document.addEventListener("DOMContentLoaded", function() {
     function updateMembers(eventId) {
+    var membersList = $('#members-list');
+    // Обновляется только первая страница участников
+    if (membersList.data('paged')) {
+        return;
+    }
     $.ajax({
         url: '/api/events/' + eventId + '/members/',
         method: 'GET',
+        data: {limit: membersList.data('limit'), q: membersList.data('query')},
         dataType: 'json',
         success: function (data) {
-            var membersList = $('#members-list');
+                var members = data.results;
                 membersList.empty();
-                if (data.length === 0) {
+                if (members.length === 0) {
                     membersList.append('<li>Нет участников</li>')
                 }
-                for (var i = 0; i < data.length; i++) {
-                    membersList.append('<li><a href="/profile/' + data[i].id + '">' + data[i].first_name + ' ' + data[i].last_name + '</a></li>');
+                for (var i = 0; i < members.length; i++) {
+                    membersList.append('<li><a href="/profile/' + members[i].id + '">' + members[i].first_name + ' ' + members[i].last_name + '</a></li>');
+                }
+                var next = $('#members-next');
+                if (data.next) {
+                    next.attr('href', '?q=' + encodeURIComponent(membersList.data('query')) + '&after=' + data.next).show();
+                } else {
+                    next.hide();
                 }
         },
         error: function (error) {
@@ -0,0 +1,82 @@
+import time
+import uuid
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from Calendar_Of_Events.hosts import allowed_host
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+        Сравнивает обращения к БД на просмотр страницы для разных хранилищ сессий.
+
+        Для каждого хранилища выполняется вход и заданное количество просмотров
+        главной страницы (ответы должны иметь код 200); выводится среднее количество запросов к django_session
+        и ко всей БД на страницу и среднее время ответа. Отдельно измеряется
+        количество запросов к БД при изменении данных сессии.
+
+    """
+    help = 'Сравнивает хранилища сессий по количеству запросов к БД'
+    engines = (
+        'django.contrib.sessions.backends.db',
+        'django.contrib.sessions.backends.cached_db',
+        'Calendar_Of_Events.session_backend',
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Количество просмотров страницы')
+        parser.add_argument('--path', default='/index', help='Адрес просматриваемой страницы')
+
+    def handle(self, *args, **options):
+        # Временный пользователь с уникальным именем, чтобы не затронуть существующих
+        user = CustomUser.objects.create_user(
+            f'bench_sessions_{uuid.uuid4().hex}', None, first_name='Bench', last_name='Sessions'
+        )
+        try:
+            self.measure_views(user, options['path'], options['requests'])
+            self.measure_writes(options['requests'])
+        finally:
+            user.delete()
+
+    def measure_views(self, user, path, count):
+        self.stdout.write(f'{"Хранилище":<45}{"сессии/стр":>12}{"запросы/стр":>13}{"мс/стр":>10}')
+        for engine in self.engines:
+            with override_settings(SESSION_ENGINE=engine):
+                client = Client(HTTP_HOST=allowed_host())
+                client.force_login(user)
+                response = client.get(path)
+                if response.status_code != 200:
+                    client.logout()
+                    raise CommandError(f'{path} вернул код {response.status_code}, измерение невозможно')
+                statuses = set()
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(count):
+                        statuses.add(client.get(path).status_code)
+                    elapsed = time.perf_counter() - started
+                client.logout()
+            session_queries = sum('django_session' in query['sql'] for query in queries.captured_queries)
+            self.stdout.write(
+                f'{engine:<45}{session_queries / count:>12.2f}{len(queries) / count:>13.2f}'
+                f'{elapsed / count * 1000:>10.2f}  коды ответа: {", ".join(map(str, sorted(statuses)))}'
+            )
+
+    def measure_writes(self, count):
+        self.stdout.write(f'\n{"Хранилище":<45}{"запросы на изменение сессии":>30}')
+        for engine in self.engines:
+            with override_settings(SESSION_ENGINE=engine):
+                store_class = import_module(engine).SessionStore
+                store = store_class()
+                store.create()
+                with CaptureQueriesContext(connection) as queries:
+                    for value in range(count):
+                        session = store_class(store.session_key)
+                        session['value'] = value
+                        session.save()
+                store.delete()
+            self.stdout.write(f'{engine:<45}{len(queries) / count:>30.2f}')
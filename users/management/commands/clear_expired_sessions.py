@@ -0,0 +1,33 @@
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """
+        Удаляет истекшие сессии из БД пачками.
+
+        В отличие от clearsessions, не удаляет все строки одним DELETE, поэтому
+        не блокирует таблицу django_session надолго.
+
+    """
+    help = 'Удаляет истекшие сессии пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Количество сессий в одном DELETE')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size должен быть положительным')
+        now = timezone.now()
+        total = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            Session.objects.filter(session_key__in=keys).delete()
+            total += len(keys)
+        self.stdout.write(self.style.SUCCESS(f'Удалено истекших сессий: {total}'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from Calendar.bulk import batched
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+        Заполняет поля поиска по имени и фамилии для существующих пользователей.
+
+        Нужна один раз после добавления полей search_first_name и search_last_name
+        и после создания пользователей в обход CustomUser.save (например, bulk_create).
+
+    """
+    help = 'Заполняет поля поиска по имени и фамилии пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Количество пользователей в одном UPDATE')
+
+    def handle(self, *args, **options):
+        total = 0
+        users = CustomUser.objects.only('id', 'first_name', 'last_name').order_by('id').iterator()
+        for batch in batched(users, options['batch_size']):
+            for user in batch:
+                user.search_first_name = user.first_name.casefold()
+                user.search_last_name = user.last_name.casefold()
+            with transaction.atomic():
+                CustomUser.objects.bulk_update(batch, ['search_first_name', 'search_last_name'])
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Обновлено пользователей: {total}'))
@@ -60,6 +60,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
             last_name (str): Фамилия пользователя.
             date_joined (datetime): Дата и время регистрации пользователя.
             birth_date (date, optional): Дата рождения пользователя (может быть None).
+            search_first_name (str): Имя без учета регистра (casefold) для поиска по началу имени.
+            search_last_name (str): Фамилия без учета регистра (casefold) для поиска по началу фамилии.
 
             is_active (bool): Флаг активности пользователя.
             is_staff (bool): Флаг сотрудника. True для суперпользователей.
@@ -70,6 +72,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
             has_perm(perm, obj=None): Проверяет разрешения.
             get_short_name(): Возвращает короткое имя пользователя.
             get_full_name(): Возвращает полное имя пользователя.
+            save(): Сохраняет пользователя, обновляя поля для поиска.
     """
     id = models.AutoField(primary_key=True)
     username = models.CharField(unique=True, max_length=30)
@@ -77,6 +80,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     last_name = models.CharField(max_length=30)
     date_joined = models.DateTimeField(auto_now_add=True)
     birth_date = models.DateField(null=True, blank=True)
+    search_first_name = models.CharField(max_length=60, db_index=True, editable=False, default='')
+    search_last_name = models.CharField(max_length=60, db_index=True, editable=False, default='')
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
@@ -87,6 +92,19 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    def save(self, *args, **kwargs):
+        self.search_first_name = self.first_name.casefold()
+        self.search_last_name = self.last_name.casefold()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'first_name' in update_fields:
+                update_fields.add('search_first_name')
+            if 'last_name' in update_fields:
+                update_fields.add('search_last_name')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def has_module_perms(self, app_label):
         return self.is_staff
 